@@ -0,0 +1,196 @@
+# UnoAnalytics.py
+# Streaming queries over UnoLog game logs. Each log file is memory-mapped
+# and read one game at a time through generator stages:
+#   log_games -> filter_games -> reduce_games -> group_by
+# A reducer turns one game's events into (key, value) pairs and group_by
+# folds them into a Summary per key, so memory stays the same whatever the
+# corpus size. Files are the unit of sharding: with workers > 1 each file is
+# reduced in its own process and the per-key Summaries are merged.
+import argparse
+import mmap
+import sys
+import time
+from multiprocessing import Pool
+
+from UnoGame import SUPER_TYPES, card_by_id
+from UnoLog import PLAY, DRAW, PENALTY, SUPER_DRAW, TURN, WIN, read_games, replay_steps
+
+# Running count, total, min and max of the values seen for one key
+class Summary:
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+# Games of one log file, read through a memory map
+def log_games(path):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from read_games(data)
+
+def corpus_games(paths):
+    for path in paths:
+        yield from log_games(path)
+
+def filter_games(games, predicate):
+    return (events for events in games if predicate(events))
+
+def reduce_games(games, reducer):
+    for events in games:
+        yield from reducer(events)
+
+def group_by(pairs, groups=None):
+    groups = {} if groups is None else groups
+    for key, value in pairs:
+        summary = groups.get(key)
+        if summary is None:
+            summary = groups[key] = Summary()
+        summary.add(value)
+    return groups
+
+# Helpers for reducers
+
+def players_in(events):
+    return len(events[0][1][3])
+
+def winner_of(events):
+    for event in reversed(events):
+        if event[0] == WIN:
+            return event[1]
+    return None
+
+# (event, hand sizes before the event) for each event of a game
+def with_hand_sizes(events):
+    sizes = [len(hand) for hand in events[0][1][3]]
+    for event in events:
+        yield event, sizes
+        op = event[0]
+        if op == PLAY:
+            sizes[event[1]] -= 1
+        elif op == DRAW or op == SUPER_DRAW:
+            sizes[event[1]] += 1
+        elif op == PENALTY:
+            sizes[event[1]] += len(event[2])
+
+# Reducers: one game's events -> (key, value) pairs
+
+# For each super card type: 1 if the first player to play it won, else 0
+def first_super_player_wins(events):
+    winner = winner_of(events)
+    if winner is None:
+        return
+    first = {}
+    for event in events:
+        if event[0] == PLAY:
+            card_type = card_by_id(event[3]).type
+            if card_type in SUPER_TYPES and card_type not in first:
+                first[card_type] = event[1]
+    for card_type, seat in first.items():
+        yield card_type, int(seat == winner)
+
+# Hand size of the player (before playing it) whenever a super card is played
+def hand_size_at_super(events):
+    for event, sizes in with_hand_sizes(events):
+        if event[0] == PLAY:
+            card_type = card_by_id(event[3]).type
+            if card_type in SUPER_TYPES:
+                yield card_type, sizes[event[1]]
+
+# Plays made while a play-all effect is on (the engine's canAllPlay flag),
+# by card type: 1 if the card could not have been played otherwise. Needs
+# the engine state, so the game is replayed.
+def play_all_exploited(events):
+    for event, game in replay_steps(events, verify=False):
+        if event[0] == PLAY and game.canAllPlay:
+            card = card_by_id(event[3])
+            yield card.type, int(not card.is_playable(game.top_card, False, game.active_color))
+
+def seat_wins(events):
+    winner = winner_of(events)
+    if winner is not None:
+        for seat in range(players_in(events)):
+            yield f"seat {seat + 1}", int(seat == winner)
+
+def game_length(events):
+    yield f"{players_in(events)} players", sum(1 for event in events if event[0] == TURN)
+
+QUERIES = {
+    "first-super-wins": (first_super_player_wins, "win rate of the first player to play each super card"),
+    "hand-size-at-super": (hand_size_at_super, "hand size when each super card is played"),
+    "play-all-exploited": (play_all_exploited, "share of play-all plays that needed the effect"),
+    "seat-wins": (seat_wins, "win rate by seat"),
+    "game-length": (game_length, "turns per game by player count"),
+}
+
+# Run a query over one file (a shard); players limits it to games with that
+# many players
+def run_shard(job):
+    query, path, players = job
+    games = log_games(path)
+    if players is not None:
+        games = filter_games(games, lambda events: players_in(events) == players)
+    return group_by(reduce_games(games, QUERIES[query][0]))
+
+def run_query(query, paths, players=None, workers=1):
+    jobs = [(query, path, players) for path in paths]
+    groups = {}
+    if workers == 1:
+        results = map(run_shard, jobs)
+    else:
+        pool = Pool(workers)
+        results = pool.imap_unordered(run_shard, jobs)
+    try:
+        for shard in results:
+            for key, summary in shard.items():
+                groups.setdefault(key, Summary()).merge(summary)
+    finally:
+        if workers != 1:
+            pool.close()
+            pool.join()
+    return groups
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate statistics over UnoLog game logs.")
+    parser.add_argument("query", choices=sorted(QUERIES))
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--players", type=int, default=None, help="only games with this many players")
+    parser.add_argument("--workers", type=int, default=1, help="processes; each file is one shard")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    groups = run_query(args.query, args.logs, args.players, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.query}: {QUERIES[args.query][1]}")
+    print(f"{'key':<14}{'count':>9}{'mean':>10}{'min':>7}{'max':>7}")
+    for key in sorted(groups):
+        s = groups[key]
+        print(f"{key:<14}{s.count:>9}{s.mean():>10.3f}{s.minimum:>7}{s.maximum:>7}")
+    print(f"{len(args.logs)} files in {elapsed:.2f} s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
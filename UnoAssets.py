@@ -0,0 +1,159 @@
+# UnoAssets.py
+# Card image cache for the window. Every assets/cards/*.png is decoded once;
+# scaled copies are kept per (name, width, height) in an LRU bounded by
+# pixel memory, so turn changes reuse pixmaps instead of reloading and
+# rescaling PNGs. AssetPreloader decodes and scales everything on a worker
+# thread while the menu is up.
+import os
+import time
+import wave
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QPixmap, QImage
+
+from UnoGame import KINDS, COLORS
+
+CARD_DIR = os.path.join("assets", "cards")
+BACKGROUND_PATH = os.path.join("assets", "backgrounds", "Background12.png")
+HAND_CARD_SIZE = (80, 120)  # Cards in the current player's hand
+PILE_CARD_SIZE = (100, 150)  # Deck, super deck and discard pile
+WINDOW_SIZE = (1000, 600)  # Initial game window size
+
+# Image name of a card: assets/cards/<color>_<type>.png
+def card_image_name(card):
+    return f"{card.color}_{card.type}"
+
+# Every image the window shows from assets/cards
+CARD_IMAGE_NAMES = ([card_image_name(card) for card in KINDS] + ["back", "super_card_back"] +
+                    [f"card_selected_{color}" for color in COLORS[:4]])
+
+class CardImageCache:
+    def __init__(self, card_dir=CARD_DIR, max_bytes=32 * 1024 * 1024):
+        self.card_dir = card_dir
+        self.max_bytes = max_bytes
+        self.originals = {}  # name -> full-size QPixmap, never evicted
+        self.scaled = OrderedDict()  # (name, width, height) -> QPixmap, LRU order
+        self.scaled_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.decodes = 0
+
+    def original(self, name):
+        pixmap = self.originals.get(name)
+        if pixmap is None:
+            pixmap = QPixmap(os.path.join(self.card_dir, f"{name}.png"))
+            self.originals[name] = pixmap
+            self.decodes += 1
+        return pixmap
+
+    # Card image scaled to fit width x height, keeping its aspect ratio
+    def pixmap(self, name, width, height):
+        key = (name, width, height)
+        pixmap = self.scaled.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self.scaled.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        pixmap = self.original(name).scaled(width, height, Qt.KeepAspectRatio)
+        self.scaled[key] = pixmap
+        self.scaled_bytes += pixmap_bytes(pixmap)
+        while self.scaled_bytes > self.max_bytes and len(self.scaled) > 1:
+            _, old = self.scaled.popitem(last=False)
+            self.scaled_bytes -= pixmap_bytes(old)
+            self.evictions += 1
+        return pixmap
+
+    def card_pixmap(self, card, width, height):
+        return self.pixmap(card_image_name(card), width, height)
+
+    # Take scaled images decoded off the GUI thread ({(name, width, height):
+    # QImage}). QPixmap can only be made on the GUI thread, so the
+    # conversion happens here.
+    def add_images(self, images):
+        for key, image in images.items():
+            if key in self.scaled:
+                continue
+            pixmap = QPixmap.fromImage(image)
+            self.scaled[key] = pixmap
+            self.scaled_bytes += pixmap_bytes(pixmap)
+        while self.scaled_bytes > self.max_bytes and len(self.scaled) > 1:
+            _, old = self.scaled.popitem(last=False)
+            self.scaled_bytes -= pixmap_bytes(old)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "decodes": self.decodes,
+            "scaled_entries": len(self.scaled),
+            "scaled_bytes": self.scaled_bytes,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"card images: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%}), {stats['evictions']} evictions, "
+                f"{stats['decodes']} decodes, {stats['scaled_bytes'] / 1024:.0f} KiB scaled")
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+# Decodes and scales the card images (at each of `sizes`) and the
+# background on a worker thread, and reads the sound files through once so
+# they are in the OS file cache. QImage is safe to use off the GUI thread;
+# the receiver turns the images into pixmaps (CardImageCache.add_images).
+# QSoundEffect has to be created on the GUI thread, so the receiver builds
+# the sound effects (UnoAudio.SoundEngine) when `ready` fires.
+class AssetPreloader(QThread):
+    progress = Signal(int, int)  # done, total
+    ready = Signal(object)  # {"cards", "background", "scaled_background", "seconds"}
+
+    def __init__(self, sizes, background_path=None, background_size=None,
+                 sound_paths=(), card_dir=CARD_DIR, parent=None):
+        super().__init__(parent)
+        self.sizes = sizes
+        self.background_path = background_path
+        self.background_size = background_size
+        self.sound_paths = sound_paths
+        self.card_dir = card_dir
+
+    def run(self):
+        start = time.perf_counter()
+        total = len(CARD_IMAGE_NAMES) + len(self.sound_paths) + 1
+        done = 0
+        cards = {}
+        for name in CARD_IMAGE_NAMES:
+            image = QImage(os.path.join(self.card_dir, f"{name}.png"))
+            for width, height in self.sizes:
+                # Same transformation as CardImageCache.pixmap
+                cards[(name, width, height)] = image.scaled(width, height, Qt.KeepAspectRatio)
+            done += 1
+            self.progress.emit(done, total)
+
+        for path in self.sound_paths:
+            try:
+                with wave.open(path, "rb") as sound:
+                    sound.readframes(sound.getnframes())
+            except (OSError, EOFError, wave.Error):
+                pass  # The window reports missing sounds itself
+            done += 1
+            self.progress.emit(done, total)
+
+        background = scaled_background = None
+        if self.background_path is not None:
+            background = QImage(self.background_path)
+            if self.background_size is not None and not background.isNull():
+                scaled_background = background.scaled(*self.background_size, Qt.IgnoreAspectRatio,
+                                                      Qt.SmoothTransformation)
+        done += 1
+        self.progress.emit(done, total)
+        self.ready.emit({"cards": cards, "background": background,
+                         "scaled_background": scaled_background,
+                         "seconds": time.perf_counter() - start})
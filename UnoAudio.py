@@ -0,0 +1,63 @@
+# UnoAudio.py
+# Sound effects for the window. Each WAV in sounds/ is loaded into a
+# QSoundEffect once at startup; playing a sound picks an idle voice of that
+# sound (adding one, up to the limits, so rapid actions overlap instead of
+# cutting each other off) or restarts its oldest voice. A disabled engine
+# creates no Qt objects and never imports QtMultimedia.
+import os
+import time
+
+SOUND_DIR = "sounds"
+SOUND_EFFECTS = ("DrawCard.wav", "PlayCard.wav", "Winner.wav")
+
+class SoundEngine:
+    def __init__(self, names=SOUND_EFFECTS, sound_dir=SOUND_DIR, voices_per_sound=3,
+                 max_voices=8, volume=1.0, enabled=True):
+        self.enabled = enabled
+        self.voices_per_sound = voices_per_sound
+        self.max_voices = max_voices
+        self.volume = volume
+        self.sound_dir = sound_dir
+        self.voices = {}  # name -> [[QSoundEffect, start time], ...]
+        self.voice_count = 0
+        if not enabled:
+            return
+        for name in names:
+            self.voices[name] = [self.new_voice(name)]
+
+    def new_voice(self, name):
+        from PySide6.QtMultimedia import QSoundEffect
+        from PySide6.QtCore import QUrl
+        effect = QSoundEffect()
+        effect.setSource(QUrl.fromLocalFile(os.path.join(os.getcwd(), self.sound_dir, name)))
+        effect.setVolume(self.volume)
+        self.voice_count += 1
+        return [effect, 0.0]
+
+    def play(self, name):
+        if not self.enabled:
+            return
+        voices = self.voices.get(name)
+        if voices is None:  # Not preloaded; load it now if the voice cap allows
+            if self.voice_count >= self.max_voices:
+                return
+            voices = self.voices[name] = [self.new_voice(name)]
+        voice = None
+        for candidate in voices:
+            if not candidate[0].isPlaying():
+                voice = candidate
+                break
+        if voice is None:
+            if len(voices) < self.voices_per_sound and self.voice_count < self.max_voices:
+                voice = self.new_voice(name)
+                voices.append(voice)
+            else:
+                voice = min(voices, key=lambda v: v[1])  # Restart the oldest
+                voice[0].stop()
+        voice[1] = time.perf_counter()
+        voice[0].play()
+
+    def stop_all(self):
+        for voices in self.voices.values():
+            for effect, _ in voices:
+                effect.stop()
@@ -0,0 +1,233 @@
+# UnoBatch.py
+# Batch simulator: plays N independent games at once as NumPy arrays and
+# advances all of them one turn per vectorised step(). The rules are the
+# same as UnoGame (including doubleplay, chiefskip, intplayall and
+# extplayall) and every seat plays UnoBots.simple_policy, so results can be
+# checked against scalar games driven by UnoGame.take_turn.
+import numpy as np
+
+from UnoGame import DECK_CARDS, COLORS, COLOR_BITS, WILD_TYPES, KINDS, KIND_OF_CODE
+
+# Hands are stored as counts per card kind (UnoGame.KINDS order), which is
+# also simple_policy's preference order
+NUM_KINDS = len(KINDS)
+NUM_COLORED = 52
+
+KIND_COLOR = np.array([COLORS.index(card.color) for card in KINDS], dtype=np.int8)
+IS_WILD = np.array([card.type in WILD_TYPES for card in KINDS])
+IS_SUPER = np.array([card.color == "super" for card in KINDS])
+
+def _kinds_of_type(card_type):
+    return np.array([card.type == card_type for card in KINDS])
+
+IS_SKIP = _kinds_of_type("skip")
+IS_REVERSE = _kinds_of_type("reverse")
+IS_PLUS2 = _kinds_of_type("plus2")
+IS_PLUS4 = _kinds_of_type("plus4")
+IS_EXTPLAYALL = _kinds_of_type("extplayall")
+IS_INTPLAYALL = _kinds_of_type("intplayall")
+IS_DOUBLEPLAY = _kinds_of_type("doubleplay")
+IS_CHIEFSKIP = _kinds_of_type("chiefskip")
+
+DECK_KINDS = np.array([KIND_OF_CODE[card.code] for card in DECK_CARDS], dtype=np.int8)
+SUPER_KINDS = np.flatnonzero(IS_SUPER).astype(np.int8)
+
+# LEGAL[active colour index, top kind] -> bool mask of playable kinds,
+# derived from Card.is_playable like UnoGame.PLAYABLE
+LEGAL = np.array([[[card.is_playable(top, False, COLOR_BITS[color]) for card in KINDS]
+                   for top in KINDS]
+                  for color in COLORS])
+
+class BatchUnoGame:
+    def __init__(self, num_games, num_players=4, super_copies=3, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.num_games = num_games
+        self.num_players = num_players
+        games = np.arange(num_games)
+
+        # Draw piles: row g holds game g's pile bottom to top, deck_len deep
+        capacity = len(DECK_KINDS) + len(SUPER_KINDS) * super_copies
+        self.deck = np.zeros((num_games, capacity), dtype=np.int8)
+        self.deck[:, :len(DECK_KINDS)] = self.rng.permuted(np.tile(DECK_KINDS, (num_games, 1)), axis=1)
+        self.deck_len = np.full(num_games, len(DECK_KINDS), dtype=np.int64)
+        self.super_deck = self.rng.permuted(
+            np.tile(np.repeat(SUPER_KINDS, super_copies), (num_games, 1)), axis=1)
+        self.super_len = np.full(num_games, self.super_deck.shape[1], dtype=np.int64)
+
+        # Hands as per-kind counts; the discard pile below the top card too
+        self.hands = np.zeros((num_games, num_players, NUM_KINDS), dtype=np.int16)
+        self.discard = np.zeros((num_games, NUM_KINDS), dtype=np.int16)
+        for seat in range(num_players):
+            self.draw(games, np.full(num_games, seat), 7)
+
+        self.direction = np.ones(num_games, dtype=np.int64)
+        self.current = np.zeros(num_games, dtype=np.int64)
+        self.double_played = np.zeros(num_games, dtype=bool)
+        self.dp_player = np.full(num_games, -1, dtype=np.int64)
+        self.chief_played = np.zeros(num_games, dtype=bool)
+        self.player_to_skip = np.full(num_games, -1, dtype=np.int64)
+        self.can_all_play = np.zeros(num_games, dtype=bool)
+        self.int_player = np.full(num_games, -1, dtype=np.int64)
+        self.ext_player = np.full(num_games, -1, dtype=np.int64)
+        self.winner = np.full(num_games, -1, dtype=np.int64)
+        self.turns = np.zeros(num_games, dtype=np.int64)
+        self.initialize_top_card()
+
+    # Like UnoGame.initialize_top_card: wild cards go back under the pile
+    def initialize_top_card(self):
+        self.top = np.zeros(self.num_games, dtype=np.int8)
+        pending = np.arange(self.num_games)
+        while len(pending):
+            depth = self.deck_len[pending]
+            kinds = self.deck[pending, depth - 1]
+            wild = IS_WILD[kinds]
+            done = pending[~wild]
+            self.top[done] = kinds[~wild]
+            self.deck_len[done] -= 1
+            pending = pending[wild]
+            for g, kind in zip(pending, kinds[wild]):  # Rare: 8 of 108 cards
+                self.deck[g, 1:self.deck_len[g]] = self.deck[g, :self.deck_len[g] - 1].copy()
+                self.deck[g, 0] = kind
+        self.active = KIND_COLOR[self.top].astype(np.int64)
+
+    # Shuffle each game's discard pile (minus its top card) into its empty
+    # draw pile. Only a few games need this on any one turn.
+    def replenish(self, games):
+        for g in games:
+            cards = np.repeat(np.arange(NUM_KINDS, dtype=np.int8), self.discard[g])
+            self.rng.shuffle(cards)
+            self.deck[g, :len(cards)] = cards
+            self.deck_len[g] = len(cards)
+            self.discard[g] = 0
+
+    # Draw `number` cards into hands[games, seats], reshuffling as needed.
+    # Returns which games got their first card.
+    def draw(self, games, seats, number):
+        drew = None
+        for _ in range(number):
+            empty = games[self.deck_len[games] == 0]
+            if len(empty):
+                self.replenish(empty)
+            has = self.deck_len[games] > 0
+            if drew is None:
+                drew = has
+            g = games[has]
+            self.deck_len[g] -= 1
+            self.hands[g, seats[has], self.deck[g, self.deck_len[g]]] += 1
+        return drew
+
+    # Super Card Chief Skip Effect: the player before the skipee moves past them
+    def apply_chief_skip(self, games):
+        current = self.current[games]
+        nxt = (current + self.direction[games]) % self.num_players
+        skip = games[self.chief_played[games] & (nxt == self.player_to_skip[games])]
+        self.current[skip] = (self.current[skip] + self.direction[skip]) % self.num_players
+        self.player_to_skip[skip] = -1
+        self.chief_played[skip] = False
+
+    def play(self, games, kinds):
+        n = self.num_players
+        players = self.current[games]
+        self.hands[games, players, kinds] -= 1
+        self.discard[games, self.top[games]] += 1
+        self.top[games] = kinds
+
+        # Super cards keep the active colour and only set flags
+        sup = IS_SUPER[kinds]
+        g, k, p = games[sup], kinds[sup], players[sup]
+        self.ext_player[g[IS_EXTPLAYALL[k]]] = p[IS_EXTPLAYALL[k]]
+        self.int_player[g[IS_INTPLAYALL[k]]] = p[IS_INTPLAYALL[k]]
+        self.double_played[g[IS_DOUBLEPLAY[k]]] = True
+        self.dp_player[g[IS_DOUBLEPLAY[k]]] = p[IS_DOUBLEPLAY[k]]
+        chief = g[IS_CHIEFSKIP[k]]
+        self.player_to_skip[chief] = self.hands[chief].sum(axis=2).argmin(axis=1)
+        self.chief_played[chief] = True
+        ext = self.ext_player[g]
+        nxt = (p + self.direction[g]) % n
+        self.can_all_play[g[(ext >= 0) & (ext != nxt)]] = True
+
+        g, k, p = games[~sup], kinds[~sup], players[~sup]
+        # Super card DoublePlay Effect
+        double = g[self.double_played[g] & (self.dp_player[g] == p)]
+        self.current[double] = (self.current[double] - self.direction[double]) % n
+        self.double_played[double] = False
+        self.active[g] = KIND_COLOR[k]
+
+        # Wild cards: plus4 hits the next player, then the player names a colour
+        wild = IS_WILD[k]
+        plus4 = g[IS_PLUS4[k]]
+        victims = (self.current[plus4] + self.direction[plus4]) % n
+        self.draw(plus4, victims, 4)
+        self.current[plus4] = victims
+        gw, pw = g[wild], p[wild]
+        held = self.hands[gw, pw, :NUM_COLORED].reshape(len(gw), 4, 13).sum(axis=2)
+        self.active[gw] = held.argmax(axis=1)
+
+        g, k = g[~wild], k[~wild]
+        skip = g[IS_SKIP[k]]
+        self.current[skip] = (self.current[skip] + self.direction[skip]) % n
+        rev = g[IS_REVERSE[k]]
+        self.direction[rev] *= -1
+        if n == 2:
+            self.current[rev] = (self.current[rev] + self.direction[rev]) % n
+        plus2 = g[IS_PLUS2[k]]
+        victims = (self.current[plus2] + self.direction[plus2]) % n
+        self.draw(plus2, victims, 2)
+        self.current[plus2] = victims
+
+        self.apply_chief_skip(g)
+
+        # Super Card IntPlayAll / ExtPlayAll Effects
+        current = self.current[g]
+        nxt = (current + self.direction[g]) % n
+        intp = self.int_player[g]
+        self.can_all_play[g[intp == nxt]] = True
+        done = g[(intp == current) & self.can_all_play[g]]
+        self.can_all_play[done] = False
+        self.int_player[done] = -1
+        done = g[self.ext_player[g] == nxt]
+        self.can_all_play[done] = False
+        self.ext_player[done] = -1
+
+        # Checked last: after a doubleplay a plus2/plus4 can hit its own player
+        won = self.hands[games, players].sum(axis=1) == 0
+        self.winner[games[won]] = players[won]
+
+    # Advance every unfinished game by one turn; returns how many moved
+    def step(self):
+        live = np.flatnonzero(self.winner < 0)
+        if not len(live):
+            return 0
+        hand = self.hands[live, self.current[live]]
+        legal = (LEGAL[self.active[live], self.top[live]] | self.can_all_play[live, None]) & (hand > 0)
+        has_play = legal.any(axis=1)
+        self.play(live[has_play], legal[has_play].argmax(axis=1).astype(np.int8))
+
+        # No legal card: draw a super card while any are left, else a normal one
+        waiting = live[~has_play]
+        has_super = self.super_len[waiting] > 0
+        super_draw = waiting[has_super]
+        self.super_len[super_draw] -= 1
+        kinds = self.super_deck[super_draw, self.super_len[super_draw]]
+        self.hands[super_draw, self.current[super_draw], kinds] += 1
+        normal_draw = waiting[~has_super]
+        drew = self.draw(normal_draw, self.current[normal_draw], 1)
+        if drew is not None:
+            self.apply_chief_skip(normal_draw[drew])
+
+        self.current[live] = (self.current[live] + self.direction[live]) % self.num_players
+        self.turns[live] += 1
+        return len(live)
+
+    # Step until every game has a winner or max_turns is reached; returns
+    # the winner per game (-1 for games cut off)
+    def run(self, max_turns=5000):
+        for _ in range(max_turns):
+            if not self.step():
+                break
+        return self.winner
+
+    # Fraction of finished games won by each seat
+    def win_rates(self):
+        finished = self.winner[self.winner >= 0]
+        return np.bincount(finished, minlength=self.num_players) / max(len(finished), 1)
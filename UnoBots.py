@@ -0,0 +1,71 @@
+# UnoBots.py
+# Computer players for headless games. A bot is a callable
+# bot(game, seat) -> move, where move is what UnoGame.take_turn accepts:
+# ("play", card_index, color), ("draw",) or ("super",).
+from UnoGame import COLORS, COLOR_BITS, WILD_TYPES, KIND_OF_CODE
+
+WILD_COLORS = COLORS[:4]
+
+# Colour the player holds most of (red on ties/empty hands)
+def most_held_color(hand):
+    held = [0] * 4
+    for card in hand:
+        if card.color_bit < COLOR_BITS["all"]:
+            held[COLORS.index(card.color)] += 1
+    return COLORS[held.index(max(held))]
+
+# Play the legal card of the lowest kind (coloured cards first, then wilds,
+# then super cards) and name the colour held most; otherwise draw a super
+# card while any are left, else draw a normal card. UnoBatch plays the
+# same policy for every seat.
+def simple_policy(game, seat):
+    hand = game.players[seat]
+    legal = game.legal_moves(seat)
+    if legal:
+        index = min(legal, key=lambda i: KIND_OF_CODE[hand[i].code])
+        color = most_held_color(hand) if hand[index].type in WILD_TYPES else None
+        return ("play", index, color)
+    if game.super_deck:
+        return ("super",)
+    return ("draw",)
+
+# Uniformly random legal move; draws only when nothing can be played
+class RandomBot:
+    def __init__(self, rng):
+        self.rng = rng
+
+    def __call__(self, game, seat):
+        legal = game.legal_moves(seat)
+        if legal:
+            index = self.rng.choice(legal)
+            color = None
+            if game.players[seat][index].type in WILD_TYPES:
+                color = self.rng.choice(WILD_COLORS)
+            return ("play", index, color)
+        if game.super_deck and self.rng.random() < 0.5:
+            return ("super",)
+        return ("draw",)
+
+# MCTS with a fixed iteration count instead of a time budget, so that
+# tournament results stay reproducible
+def mcts_bot(rng):
+    from UnoMCTS import MCTSBot  # UnoMCTS imports this module
+    return MCTSBot(time_budget=60.0, rng=rng, max_iterations=200)
+
+# Bot factories by name; each takes the per-game bot RNG
+BOTS = {
+    "simple": lambda rng: simple_policy,
+    "random": RandomBot,
+    "mcts": mcts_bot,
+}
+
+# Play one game to the end with bots[seat] choosing every move. Returns the
+# winning seat (-1 if max_turns ran out) and the number of turns taken.
+def play_game(game, bots, max_turns=5000):
+    for turn in range(max_turns):
+        seat = game.current_player
+        game.take_turn(bots[seat](game, seat))
+        winner = game.check_winner()
+        if winner != -1:
+            return winner, turn + 1
+    return -1, max_turns
@@ -0,0 +1,226 @@
+# UnoBroadcast.py
+# Table state for clients and spectators as deltas with periodic keyframes.
+# StateBroadcaster observes an UnoGame and, when each move ends, builds one
+# delta: the cards that moved (hand to discard, pile to hand) and whichever
+# turn, colour, pile-size and super-card fields changed in a way the moves
+# alone do not explain (a reshuffle, say). Every keyframe_interval moves a
+# full keyframe is sent instead, so a viewer that falls behind can resync.
+#
+# A view is a seat number or None for spectators. Other players' cards are
+# hidden: a seat sees the ids of the cards it draws, everyone else only the
+# count. A message is serialised once per distinct view (public, plus each
+# seat that drew this move) and the same bytes go to every subscriber with
+# that view.
+import argparse
+import json
+import random
+import sys
+
+from UnoGame import UnoGame, UnoGameObserver
+
+# Fields diffed after every move, read off the game
+TRACKED_FIELDS = ("active_color", "direction", "current_player", "doublePlayed", "dpPlayer",
+                  "chiefPlayed", "playerToSkip", "canAllPlay", "intplayer", "extplayer")
+
+DRAWS = ("draw", "super")
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+def public_state(game):
+    state = {name: getattr(game, name) for name in TRACKED_FIELDS}
+    state["deck"] = len(game.deck)
+    state["super"] = len(game.super_deck)
+    state["discard"] = len(game.discard)
+    state["top"] = game.top_card.id
+    return state
+
+def card_count(cards):
+    return cards if isinstance(cards, int) else len(cards)
+
+# What a delta's moves do to the public state by themselves; only fields
+# that end up different from this are sent
+def advance(state, moves):
+    for move in moves:
+        if move[0] == "play":
+            state["top"] = move[3]
+            state["discard"] += 1
+        elif move[0] == "draw":
+            state["deck"] -= card_count(move[2])
+        elif move[0] == "super":
+            state["super"] -= 1
+
+# Full state as `view` may see it
+def keyframe(game, seq, view):
+    message = {"k": seq, "state": public_state(game), "sizes": list(game.hand_sizes.sizes)}
+    if view is not None:
+        message["hand"] = [card.id for card in game.players[view]]
+    return message
+
+class StateBroadcaster(UnoGameObserver):
+    def __init__(self, game, keyframe_interval=50):
+        self.game = game
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.moves = []  # This move's card movements
+        self.private = set()  # Seats that drew cards this move
+        self.state = public_state(game)
+        self.subscribers = {}  # view -> [send, ...]
+        self.messages = {}  # view -> bytes for the current seq
+        self.encodes = 0
+        self.bytes_sent = 0
+        game.add_observer(self)
+
+    def detach(self):
+        self.game.remove_observer(self)
+
+    # send(data) gets every message for `view`; it returns False once the
+    # subscriber has gone. The subscriber starts with a keyframe.
+    def subscribe(self, view, send):
+        self.subscribers.setdefault(view, []).append(send)
+        send(encode(keyframe(self.game, self.seq, view)))
+
+    def on_card_played(self, player_index, card_index, card):
+        self.moves.append(["play", player_index, card_index, card.id])
+
+    def on_card_drawn(self, player_index, card):
+        self.moves.append(["draw", player_index, [card.id]])
+        self.private.add(player_index)
+
+    def on_cards_drawn(self, player_index, cards):
+        self.moves.append(["draw", player_index, [card.id for card in cards]])
+        self.private.add(player_index)
+
+    def on_super_card_drawn(self, player_index, card):
+        self.moves.append(["super", player_index, [card.id]])
+        self.private.add(player_index)
+
+    def on_winner(self, player_index):
+        self.moves.append(["win", player_index])
+
+    def on_turn_ended(self, player_index):
+        self.commit()
+
+    # Close the current move: diff the tracked state and publish
+    def commit(self):
+        state = public_state(self.game)
+        advance(self.state, self.moves)
+        changed = {name: value for name, value in state.items() if self.state[name] != value}
+        self.state = state
+        self.seq += 1
+        self.delta = {"d": self.seq, "m": self.moves, "s": changed}
+        self.moves = []
+        self.messages = {}
+        self.publish()
+        self.private = set()
+
+    # The bytes for `view` at the current seq, encoded at most once
+    def message_for(self, view):
+        key = view if view in self.private or self.seq % self.keyframe_interval == 0 else None
+        data = self.messages.get(key)
+        if data is None:
+            if self.seq % self.keyframe_interval == 0:
+                message = keyframe(self.game, self.seq, key)
+            elif key is None:
+                # Drawn cards become counts for everyone but the drawer
+                moves = [[move[0], move[1], len(move[2])] if move[0] in DRAWS else move
+                         for move in self.delta["m"]]
+                message = dict(self.delta, m=moves)
+            else:
+                moves = [[move[0], move[1], len(move[2])] if move[0] in DRAWS and move[1] != key
+                         else move for move in self.delta["m"]]
+                message = dict(self.delta, m=moves)
+            data = self.messages[key] = encode(message)
+            self.encodes += 1
+        return data
+
+    def publish(self):
+        for view, sends in self.subscribers.items():
+            data = self.message_for(view)
+            live = [send for send in sends if send(data) is not False]
+            self.bytes_sent += len(data) * len(live)
+            sends[:] = live
+
+# A client's copy of the table, kept up to date from keyframes and deltas
+class ViewState:
+    def __init__(self, view):
+        self.view = view
+        self.seq = None
+        self.state = None
+        self.sizes = None
+        self.hand = None
+
+    def apply(self, message):
+        if "k" in message:
+            self.seq = message["k"]
+            self.state = dict(message["state"])
+            self.sizes = list(message["sizes"])
+            self.hand = list(message["hand"]) if "hand" in message else None
+            return
+        if self.seq is None:
+            return  # Wait for a keyframe
+        if message["d"] != self.seq + 1:
+            raise ValueError(f"missed a delta: have {self.seq}, got {message['d']}")
+        self.seq = message["d"]
+        for move in message["m"]:
+            if move[0] == "play":
+                _, seat, index, card_id = move
+                self.sizes[seat] -= 1
+                if seat == self.view:
+                    del self.hand[index]
+            elif move[0] in DRAWS:
+                seat, cards = move[1], move[2]
+                self.sizes[seat] += card_count(cards)
+                if seat == self.view:
+                    self.hand.extend(cards)
+        advance(self.state, message["m"])
+        self.state.update(message["s"])
+
+# Play bot games with spectators and every seat subscribed, check each
+# view against the game, and compare the bytes sent with sending every
+# viewer a full keyframe after every move
+def main(argv=None):
+    from UnoBots import simple_policy
+
+    parser = argparse.ArgumentParser(description="Measure delta broadcasts against full-state updates.")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--spectators", type=int, default=100)
+    parser.add_argument("--keyframe-interval", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    moves = delta_bytes = full_bytes = encodes = 0
+    for i in range(args.games):
+        game = UnoGame(args.players, rng=random.Random(f"{args.seed}/{i}"))
+        broadcaster = StateBroadcaster(game, args.keyframe_interval)
+        views = [ViewState(seat) for seat in range(args.players)] + [ViewState(None)]
+        for view in views:
+            broadcaster.subscribe(view.view, lambda data, view=view: view.apply(json.loads(data)))
+        for _ in range(args.spectators - 1):
+            broadcaster.subscribe(None, lambda data: None)
+        for _ in range(5000):
+            seat = game.current_player
+            game.take_turn(simple_policy(game, seat))
+            moves += 1
+            for view in views:
+                expected = keyframe(game, broadcaster.seq, view.view)
+                if (view.state, view.sizes, view.hand) != (expected["state"], expected["sizes"],
+                                                             expected.get("hand")):
+                    raise AssertionError(f"game {i}: view {view.view} out of step")
+            full_bytes += sum(len(encode(keyframe(game, broadcaster.seq, view)))
+                              for view in list(range(args.players)) + [None] * args.spectators)
+            if game.check_winner() != -1:
+                break
+        delta_bytes += broadcaster.bytes_sent
+        encodes += broadcaster.encodes
+
+    viewers = args.players + args.spectators
+    print(f"{args.games} games, {moves} moves, {viewers} viewers per table")
+    print(f"full state every move: {full_bytes / moves:.0f} bytes/move")
+    print(f"deltas + keyframes:    {delta_bytes / moves:.0f} bytes/move "
+          f"({delta_bytes / full_bytes:.1%}), {encodes / moves:.2f} encodes/move")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+# UnoLog.py
+# Event-sourced game records. GameRecorder observes an UnoGame and appends
+# one small binary record per state change to a GameLogWriter, which buffers
+# them and writes in bulk. A game starts with a START record holding the
+# full snapshot (so the deal and deck order are known); reshuffles record
+# the new deck order, so replays never depend on the RNG. replay() feeds
+# the moves back through the engine to rebuild the game at any turn.
+#
+# File layout: MAGIC, VERSION, then records back to back (many games per
+# file). A record is an opcode byte followed by its fields, one byte each:
+#   START      players, 12 state bytes, then (count, card ids...) for the
+#              draw pile, the cards under it, the super deck, every hand
+#              and the discard pile
+#   PLAY       seat, card_index, card_id
+#   DRAW       seat, card_id          (drawing as the move)
+#   PENALTY    seat, count, card_ids  (plus2/plus4 draws)
+#   SUPER_DRAW seat, card_id
+#   COLOR      colour index (COLORS)
+#   EFFECT     type id (TYPES), seat, target seat
+#   SHUFFLE    count, card_ids        (new draw pile, top last)
+#   TURN       next seat
+#   WIN        seat
+# Seats, card ids, hand positions and pile sizes all fit in a byte; NONE
+# stands for None.
+import argparse
+import random
+import sys
+import time
+
+from UnoGame import (UnoGame, UnoGameObserver, STATE_FIELDS, COLORS, TYPES, TYPE_IDS,
+                     card_by_id)
+
+MAGIC = b"UNOL"
+VERSION = 1
+NONE = 255
+
+START, PLAY, DRAW, PENALTY, SUPER_DRAW, COLOR, EFFECT, SHUFFLE, TURN, WIN = range(10)
+EVENT_NAMES = ("start", "play", "draw", "penalty", "super_draw", "color", "effect",
+               "shuffle", "turn", "win")
+FIXED_FIELDS = {PLAY: 3, DRAW: 2, SUPER_DRAW: 2, COLOR: 1, EFFECT: 3, TURN: 1, WIN: 1}
+CARD_FIELDS = {"top_card", "previous_card"}
+
+def byte_or_none(value):
+    return NONE if value is None else value
+
+# data[pos:pos + count]; IndexError, like a single byte read, when the data
+# ends first (readers turn it into their own "truncated" ValueError)
+def take(data, pos, count):
+    if pos + count > len(data):
+        raise IndexError(f"record runs past byte {len(data)}")
+    return data[pos:pos + count]
+
+def encode_snapshot(snapshot):
+    deck, under, super_deck, hands, discard, state = snapshot
+    out = bytearray((START, len(hands)))
+    for name, value in zip(STATE_FIELDS, state):
+        if name in CARD_FIELDS:
+            out.append(NONE if value is None else value.id)
+        elif name == "direction":
+            out.append(value & 0xFF)  # -1 -> 255
+        else:
+            out.append(byte_or_none(value))  # bools and seats
+    for cards in (deck, under, super_deck, *hands, discard):
+        out.append(len(cards))
+        out.extend(card.id for card in cards)
+    return bytes(out)
+
+# Turn a START record's fields (data[pos:] after the opcode) back into a
+# snapshot; returns (snapshot, next position). Raises IndexError if data
+# ends inside the record.
+def decode_snapshot(data, pos):
+    players = data[pos]
+    pos += 1
+    state = []
+    for name, value in zip(STATE_FIELDS, take(data, pos, len(STATE_FIELDS))):
+        if name in CARD_FIELDS:
+            state.append(None if value == NONE else card_by_id(value))
+        elif name == "direction":
+            state.append(-1 if value == 255 else value)
+        elif name in ("doublePlayed", "chiefPlayed", "canAllPlay"):
+            state.append(bool(value))
+        else:
+            state.append(None if value == NONE else value)
+    pos += len(STATE_FIELDS)
+    piles = []
+    for _ in range(players + 4):
+        count = data[pos]
+        piles.append(tuple(card_by_id(i) for i in take(data, pos + 1, count)))
+        pos += 1 + count
+    deck, under, super_deck = piles[:3]
+    snapshot = (deck, under, super_deck, tuple(piles[3:-1]), piles[-1], tuple(state))
+    return snapshot, pos
+
+# Buffers records in memory and writes them to the file in bulk
+class GameLogWriter:
+    def __init__(self, path, buffer_size=1 << 16):
+        self.file = open(path, "ab")
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.bytes_written = 0
+        if self.file.tell() == 0:
+            self.buffer += MAGIC + bytes((VERSION,))
+
+    def write(self, record):
+        self.buffer += record
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.bytes_written += len(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Writes every state change of one game to a GameLogWriter
+class GameRecorder(UnoGameObserver):
+    def __init__(self, game, writer):
+        self.game = game
+        self.writer = writer
+        writer.write(encode_snapshot(game.snapshot()))
+        game.add_observer(self)
+
+    def detach(self):
+        self.game.remove_observer(self)
+
+    def on_winner(self, player_index):
+        self.writer.write(bytes((WIN, player_index)))
+
+    def on_card_played(self, player_index, card_index, card):
+        self.writer.write(bytes((PLAY, player_index, card_index, card.id)))
+
+    def on_card_drawn(self, player_index, card):
+        self.writer.write(bytes((DRAW, player_index, card.id)))
+
+    def on_cards_drawn(self, player_index, cards):
+        self.writer.write(bytes((PENALTY, player_index, len(cards), *(card.id for card in cards))))
+
+    def on_super_card_drawn(self, player_index, card):
+        self.writer.write(bytes((SUPER_DRAW, player_index, card.id)))
+
+    def on_color_chosen(self, color):
+        self.writer.write(bytes((COLOR, COLORS.index(color))))
+
+    def on_super_effect(self, card_type, player_index, target):
+        self.writer.write(bytes((EFFECT, TYPE_IDS[card_type], player_index, byte_or_none(target))))
+
+    def on_deck_shuffled(self, cards):
+        self.writer.write(bytes((SHUFFLE, len(cards), *(card.id for card in cards))))
+
+    def on_turn_ended(self, player_index):
+        self.writer.write(bytes((TURN, player_index)))
+
+# Events in a log (bytes, bytearray or mmap) as tuples: (START, snapshot),
+# (SHUFFLE, card_ids), (PENALTY, seat, card_ids) or (opcode, *fields)
+def read_events(data):
+    if len(data) <= len(MAGIC) or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a game log")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"unsupported game log version {data[len(MAGIC)]}")
+    pos = len(MAGIC) + 1
+    end = len(data)
+    while pos < end:
+        op = data[pos]
+        pos += 1
+        size = FIXED_FIELDS.get(op)
+        try:
+            if size is not None:
+                event = (op, *take(data, pos, size))
+                pos += size
+            elif op == START:
+                snapshot, pos = decode_snapshot(data, pos)
+                event = (START, snapshot)
+            elif op == SHUFFLE:
+                count = data[pos]
+                event = (SHUFFLE, tuple(take(data, pos + 1, count)))
+                pos += 1 + count
+            elif op == PENALTY:
+                count = data[pos + 1]
+                event = (PENALTY, data[pos], tuple(take(data, pos + 2, count)))
+                pos += 2 + count
+            else:
+                raise ValueError(f"bad event {op} at byte {pos - 1}")
+        except IndexError:
+            raise ValueError("truncated game log") from None
+        yield event
+
+# The events of each game in turn, as lists starting with START
+def read_games(data):
+    game = None
+    for event in read_events(data):
+        if event[0] == START:
+            if game:
+                yield game
+            game = []
+        if game is not None:
+            game.append(event)
+    if game:
+        yield game
+
+# Stands in for the game's RNG during replay: every shuffle produces the
+# order the log recorded
+class ReplayRNG:
+    def __init__(self, orders):
+        self.orders = iter(orders)
+
+    def shuffle(self, cards):
+        cards[:] = [card_by_id(i) for i in next(self.orders)]
+
+# Step a game through its events: yields (event, game) with the game as it
+# stood before that event, then applies the event. With verify, each
+# recorded card is checked against what the engine does and a mismatch
+# raises ValueError.
+def replay_steps(events, verify=True):
+    if not events or events[0][0] != START:
+        raise ValueError("a game's events start with START")
+    shuffles = [event[1] for event in events if event[0] == SHUFFLE]
+    game = UnoGame.from_snapshot(events[0][1], rng=ReplayRNG(shuffles))
+    turns = 0
+    for event in events:
+        yield event, game
+        op = event[0]
+        if op == PLAY:
+            _, seat, index, card_id = event
+            if verify and game.players[seat][index].id != card_id:
+                raise ValueError(f"turn {turns}: seat {seat} holds {game.players[seat][index]} "
+                                 f"at {index}, log says {card_by_id(card_id)}")
+            game.play_card(seat, index)
+        elif op == DRAW:
+            game.draw_card(event[1])
+            if verify and game.players[event[1]][-1].id != event[2]:
+                raise ValueError(f"turn {turns}: draw mismatch")
+        elif op == SUPER_DRAW:
+            game.draw_super_card(event[1])
+        elif op == COLOR:
+            game.choose_new_color(COLORS[event[1]])
+        elif op == TURN:
+            game.end_turn()
+            turns += 1
+            if verify and game.current_player != event[1]:
+                raise ValueError(f"turn {turns}: expected seat {event[1]} to move")
+        # START, PENALTY, EFFECT, SHUFFLE and WIN follow from the moves
+
+# Rebuild a game from its events, stopping after `turn` turns (default: the
+# whole game)
+def replay(events, turn=None, verify=True):
+    turns = 0
+    game = None
+    for event, game in replay_steps(events, verify):
+        if turn is not None and turns >= turn:
+            break
+        turns += event[0] == TURN
+    return game
+
+def describe(event):
+    op = event[0]
+    if op == START:
+        return f"start: {len(event[1][3])} players, top {event[1][5][0]}"
+    if op in (PLAY, DRAW, SUPER_DRAW):
+        return f"{EVENT_NAMES[op]}: seat {event[1] + 1}, {card_by_id(event[-1])}"
+    if op == PENALTY:
+        return f"penalty: seat {event[1] + 1} draws {len(event[2])}"
+    if op == COLOR:
+        return f"color: {COLORS[event[1]]}"
+    if op == EFFECT:
+        target = "" if event[3] == NONE else f" -> seat {event[3] + 1}"
+        return f"effect: {TYPES[event[1]]} by seat {event[2] + 1}{target}"
+    if op == SHUFFLE:
+        return f"shuffle: {len(event[1])} cards"
+    return f"{EVENT_NAMES[op]}: seat {event[1] + 1}"
+
+# record: play bot games into a log; replay: rebuild one game (optionally
+# up to a turn), print it and time a full replay of the file
+def main(argv=None):
+    from UnoBots import BOTS, play_game
+
+    parser = argparse.ArgumentParser(description="Record and replay binary game logs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record")
+    record.add_argument("log")
+    record.add_argument("--games", type=int, default=100)
+    record.add_argument("--players", type=int, default=4)
+    record.add_argument("--bots", default="simple", help="bot name per seat, comma separated")
+    record.add_argument("--seed", type=int, default=0)
+    show = commands.add_parser("replay")
+    show.add_argument("log")
+    show.add_argument("--game", type=int, default=0)
+    show.add_argument("--turn", type=int, default=None)
+    show.add_argument("--events", action="store_true", help="list the game's events")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        names = args.bots.split(",")
+        start = time.perf_counter()
+        with GameLogWriter(args.log) as writer:
+            for i in range(args.games):
+                game = UnoGame(args.players, rng=random.Random(f"{args.seed}/{i}"))
+                bot_rng = random.Random(f"{args.seed}/{i}/bots")
+                bots = [BOTS[names[seat % len(names)]](bot_rng) for seat in range(args.players)]
+                GameRecorder(game, writer)
+                play_game(game, bots)
+            writer.flush()
+            size = writer.bytes_written
+        elapsed = time.perf_counter() - start
+        print(f"recorded {args.games} games, {size} bytes, in {elapsed:.2f} s")
+        return 0
+
+    with open(args.log, "rb") as f:
+        data = f.read()
+    start = time.perf_counter()
+    games = turns = events = 0
+    chosen = None
+    for i, game_events in enumerate(read_games(data)):
+        game = replay(game_events)
+        games += 1
+        events += len(game_events)
+        turns += sum(1 for event in game_events if event[0] == TURN)
+        if i == args.game:
+            chosen = game_events
+    elapsed = time.perf_counter() - start
+    print(f"replayed {games} games, {turns} turns, {events} events in {elapsed:.2f} s "
+          f"({turns / elapsed:.0f} turns/s)")
+    if chosen is None:
+        print(f"no game {args.game} in {args.log}")
+        return 1
+    if args.events:
+        for event in chosen:
+            print(describe(event))
+    game = replay(chosen, args.turn)
+    print(f"game {args.game} after {args.turn if args.turn is not None else 'all'} turns: "
+          f"top {game.top_card}, seat {game.current_player + 1} to move, "
+          f"hand sizes {game.hand_sizes.sizes}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
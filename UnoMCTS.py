@@ -0,0 +1,260 @@
+# UnoMCTS.py
+# Information-set Monte Carlo Tree Search bot. Each iteration samples a
+# determinization (the other hands, the draw pile and the super deck are
+# reshuffled consistently with what the bot can see), walks the shared tree
+# with availability-aware UCB, expands one move and plays the rest of the
+# game out with simple_policy. Root parallelisation runs independent
+# searches in a process pool and sums their root statistics.
+import argparse
+import math
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from UnoGame import UnoGame, WILD_TYPES
+from UnoBots import WILD_COLORS, simple_policy, play_game
+
+class Node:
+    __slots__ = ("parent", "player", "children", "visits", "wins", "avails")
+
+    def __init__(self, parent, player):
+        self.parent = parent
+        self.player = player  # Seat whose move led here
+        self.children = {}  # Move key -> Node
+        self.visits = 0
+        self.wins = 0
+        self.avails = 1
+
+# Moves for the seat to move, as (key, move) pairs. Keys name cards by code
+# rather than hand position so they mean the same thing in every
+# determinization. To keep the tree narrow, wild colours are limited to
+# colours the player holds, and a normal draw is only considered when
+# nothing can be played.
+def legal_keys(game, seat):
+    hand = game.players[seat]
+    options = []
+    seen = set()
+    colors = None
+    for index in game.legal_moves(seat):
+        card = hand[index]
+        if card.code in seen:
+            continue
+        seen.add(card.code)
+        if card.type in WILD_TYPES:
+            if colors is None:
+                colors = [color for color in WILD_COLORS
+                          if any(other.color == color for other in hand)] or WILD_COLORS[:1]
+            for color in colors:
+                options.append((("play", card.code, color), ("play", index, color)))
+        else:
+            options.append((("play", card.code, None), ("play", index, None)))
+    if game.super_deck:
+        options.append((("super",), ("super",)))
+    if not seen:
+        options.append((("draw",), ("draw",)))
+    return options
+
+# The move in `game` that a key names
+def move_for_key(game, seat, key):
+    if key[0] != "play":
+        return key
+    hand = game.players[seat]
+    card_id = next(iter(hand.by_code[key[1]]))
+    return ("play", hand.positions[card_id], key[2])
+
+# Copy of game as `seat` might imagine it: the cards it cannot see (other
+# hands and the draw pile) are dealt out again at random, keeping every
+# hand size, and the super deck order is reshuffled
+def determinize(game, seat, rng):
+    sample = game.clone(rng)
+    hidden = list(sample.deck)
+    for other, hand in enumerate(sample.players):
+        if other != seat:
+            hidden.extend(hand)
+    rng.shuffle(hidden)
+    start = 0
+    for other, hand in enumerate(sample.players):
+        if other != seat:
+            size = len(hand)
+            list.clear(hand)
+            list.extend(hand, hidden[start:start + size])
+            hand.rebuild_index()
+            start += size
+    sample.deck.replace(hidden[start:])
+    rng.shuffle(sample.super_deck)
+    return sample
+
+def ucb(child, exploration):
+    return child.wins / child.visits + exploration * math.sqrt(math.log(child.avails) / child.visits)
+
+# One search from `seat`'s point of view until the deadline (or
+# max_iterations, or until the threading.Event `stop` is set). Returns
+# {key: (visits, wins)} for the root's children and the number of
+# iterations, each of which ends in one rollout.
+def search(game, seat, deadline, rng, exploration=0.7, max_iterations=None, rollout_turns=300,
+           stop=None):
+    root = Node(None, None)
+    policies = [simple_policy] * game.num_players
+    stopped = stop.is_set if stop is not None else bool
+    iterations = 0
+    while (time.perf_counter() < deadline and not stopped() and
+           (max_iterations is None or iterations < max_iterations)):
+        sample = determinize(game, seat, rng)
+        node = root
+        winner = sample.check_winner()
+
+        # Selection and expansion
+        while winner == -1:
+            mover = sample.current_player
+            options = legal_keys(sample, mover)
+            untried = []
+            available = []
+            for key, move in options:
+                child = node.children.get(key)
+                if child is None:
+                    untried.append((key, move))
+                else:
+                    child.avails += 1
+                    available.append((child, move))
+            if untried:
+                key, move = rng.choice(untried)
+                sample.take_turn(move)
+                child = Node(node, mover)
+                node.children[key] = child
+                node = child
+                winner = sample.check_winner()
+                break
+            node, move = max(available, key=lambda pair: ucb(pair[0], exploration))
+            sample.take_turn(move)
+            winner = sample.check_winner()
+
+        # Rollout
+        if winner == -1:
+            winner, _ = play_game(sample, policies, rollout_turns)
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.player == winner:
+                node.wins += 1
+            node = node.parent
+        iterations += 1
+
+    stats = {key: (child.visits, child.wins) for key, child in root.children.items()}
+    return stats, iterations
+
+# Pool entry point: rebuild the game from its snapshot and search
+def search_worker(job):
+    snapshot, seat, budget, seed, exploration, max_iterations, rollout_turns = job
+    game = UnoGame.from_snapshot(snapshot)
+    deadline = time.perf_counter() + budget
+    return search(game, seat, deadline, random.Random(seed), exploration, max_iterations, rollout_turns)
+
+# Bot for UnoBots.play_game, the tournament and the window's computer
+# seats. time_budget is seconds per move; workers > 1 runs that many root
+# searches in parallel (the pool is created on first use; call close()).
+# pool is a multiprocessing pool to search in instead, e.g. one shared by
+# several bots; the bot then always searches there, workers jobs per move,
+# and leaves closing the pool to its owner.
+# Setting the threading.Event `stop` from another thread ends a search
+# early; the move returned is then the best one found so far.
+class MCTSBot:
+    def __init__(self, time_budget=1.0, workers=1, rng=None, exploration=0.7,
+                 max_iterations=None, rollout_turns=300, stop=None, pool=None):
+        self.time_budget = time_budget
+        self.workers = workers
+        self.rng = rng if rng is not None else random.Random()
+        self.exploration = exploration
+        self.max_iterations = max_iterations
+        self.rollout_turns = rollout_turns
+        self.stop = stop
+        self.pool = pool
+        self.shared_pool = pool is not None
+        self.decisions = 0
+        self.total_rollouts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_stats = None
+
+    def __call__(self, game, seat):
+        start = time.perf_counter()
+        if self.workers == 1 and not self.shared_pool:
+            stats, rollouts = search(game, seat, start + self.time_budget, self.rng,
+                                     self.exploration, self.max_iterations, self.rollout_turns,
+                                     self.stop)
+        else:
+            if self.pool is None:
+                self.pool = Pool(self.workers)
+            snapshot = game.snapshot()
+            jobs = [(snapshot, seat, self.time_budget, self.rng.getrandbits(64), self.exploration,
+                     self.max_iterations, self.rollout_turns) for _ in range(self.workers)]
+            stats = {}
+            rollouts = 0
+            pending = self.pool.map_async(search_worker, jobs)
+            while not pending.ready():
+                if self.stop is not None and self.stop.is_set():
+                    break  # The workers run out their budget; their results are dropped
+                pending.wait(0.01)
+            results = pending.get() if pending.ready() else []
+            for worker_stats, worker_rollouts in results:
+                rollouts += worker_rollouts
+                for key, (visits, wins) in worker_stats.items():
+                    total = stats.get(key, (0, 0))
+                    stats[key] = (total[0] + visits, total[1] + wins)
+
+        if stats:
+            key = max(stats, key=lambda k: stats[k][0])
+            move = move_for_key(game, seat, key)
+        else:
+            move = simple_policy(game, seat)  # Budget too small for even one iteration
+        latency = time.perf_counter() - start
+
+        self.decisions += 1
+        self.total_rollouts += rollouts
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_stats = {"rollouts": rollouts, "latency": latency,
+                           "rollouts_per_sec": rollouts / latency if latency else 0.0}
+        return move
+
+    def report(self):
+        if not self.decisions:
+            return "MCTS: no decisions yet"
+        return (f"MCTS: {self.decisions} decisions, "
+                f"{self.total_rollouts / self.total_latency:.0f} rollouts/s, "
+                f"latency avg {self.total_latency / self.decisions * 1000:.1f} ms, "
+                f"max {self.max_latency * 1000:.1f} ms, workers {self.workers}")
+
+    def close(self):
+        if self.pool is not None and not self.shared_pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+# Size hardware: play MCTS in seat 1 against simple_policy and report
+# rollout throughput and decision latency
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MCTS bot against simple_policy.")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=0.2, help="seconds per move")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    bot = MCTSBot(args.budget, args.workers, random.Random(args.seed))
+    wins = 0
+    try:
+        for i in range(args.games):
+            game = UnoGame(args.players, rng=random.Random(f"{args.seed}/{i}"))
+            winner, turns = play_game(game, [bot] + [simple_policy] * (args.players - 1))
+            wins += winner == 0
+            print(f"game {i + 1}: winner seat {winner + 1}, {turns} turns")
+    finally:
+        bot.close()
+    print(f"MCTS won {wins}/{args.games}")
+    print(bot.report())
+
+if __name__ == '__main__':
+    sys.exit(main())
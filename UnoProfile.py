@@ -0,0 +1,218 @@
+# UnoProfile.py
+# Opt-in timers, counters and latency histograms. Nothing in the game calls
+# this module directly: enable() followed by instrument() wraps the methods
+# listed in TARGETS (engine calls, asset loads, audio setSource calls,
+# widget rebuilds and turn handlers) on their classes, so with profiling
+# off there is no cost at all. instrument() only touches modules that are
+# already imported and can be called again after lazy imports.
+#
+# Engine calls are timed only on the game a GameWorker owns: its class is
+# swapped for a subclass with the timed methods. UnoGame itself is left
+# alone, so the bots' search clones and rollouts (UnoGame.clone builds
+# plain UnoGames) neither show up in the engine numbers nor slow down.
+#
+# A turn is one move applied by the game's worker thread (GameWorker.apply),
+# including a computer seat's thinking when it is nested in GameWorker.think.
+# Time spent waiting in modal dialogs is recorded separately and left out
+# of a turn on the same thread.
+import functools
+import json
+import math
+import sys
+import threading
+import time
+
+# (module, class, kind, methods); kind is "timer", "turn", "wait" or
+# "game" (methods of the class's self.game instance, see above)
+TARGETS = (
+    ("UnoWorker", "GameWorker", "game", ("play_card", "draw_card", "draw_cards", "draw_super_card",
+                                         "replenish_deck", "legal_moves", "check_winner",
+                                         "end_turn")),
+    ("UnoAssets", "CardImageCache", "timer", ("original", "pixmap", "add_images")),
+    ("UnoAssets", "AssetPreloader", "timer", ("run",)),
+    ("UnoAudio", "SoundEngine", "timer", ("new_voice", "play")),
+    ("UnoMCTS", "MCTSBot", "timer", ("__call__",)),
+    ("UnoWindow", "UnoGameWindow", "timer", ("init_ui", "refresh", "update_player_hand",
+                                             "update_discard_pile", "update_current_player_label",
+                                             "paintEvent", "setup_background_music")),
+    ("UnoWindow", "CardHandWidget", "timer", ("set_hand", "paintEvent")),
+    ("UnoWorker", "GameWorker", "turn", ("think", "apply")),
+    ("UnoWindow", "ColorDialog", "wait", ("exec",)),
+    ("UnoWindow", "QMessageBox", "wait", ("information", "warning")),
+)
+
+# Count, total and max of a timer, with power-of-two microsecond buckets
+class Histogram:
+    __slots__ = ("count", "total", "worst", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.buckets = {}  # b -> samples in [2**(b-1), 2**b) microseconds
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.worst:
+            self.worst = seconds
+        us = seconds * 1e6
+        bucket = 0 if us < 1 else int(math.log2(us)) + 1
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    # Upper bound of the bucket holding the p-th sample, in seconds
+    def percentile(self, p):
+        target = p * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(2 ** bucket / 1e6, self.worst)
+        return self.worst
+
+    def to_dict(self):
+        return {"count": self.count, "total_ms": self.total * 1000,
+                "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "p50_ms": self.percentile(0.5) * 1000, "p99_ms": self.percentile(0.99) * 1000,
+                "max_ms": self.worst * 1000,
+                "buckets_us": {str(2 ** b): n for b, n in sorted(self.buckets.items())}}
+
+enabled = False
+timers = {}  # name -> Histogram
+counters = {}  # name -> int
+patched = set()  # (module, class, method) already wrapped
+profiled_classes = {}  # (class, methods) -> subclass with those methods timed
+local = threading.local()  # in_turn, and waited: modal wait time inside the current turn
+
+def enable():
+    global enabled
+    enabled = True
+
+def count(name, n=1):
+    counters[name] = counters.get(name, 0) + n
+
+def histogram(name):
+    hist = timers.get(name)
+    if hist is None:
+        hist = timers[name] = Histogram()
+    return hist
+
+def timed(name, func):
+    hist = histogram(name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            hist.add(time.perf_counter() - start)
+    return wrapper
+
+def turn_timed(name, func):
+    turns = histogram("turn")
+    hist = histogram(f"turn:{name}")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(local, "in_turn", False):  # Handlers call each other; only the outermost is a turn
+            return func(*args, **kwargs)
+        local.in_turn = True
+        local.waited = 0.0
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start - local.waited
+            local.in_turn = False
+            turns.add(elapsed)
+            hist.add(elapsed)
+    return wrapper
+
+def wait_timed(name, func):
+    hist = histogram(f"wait:{name}")
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            hist.add(elapsed)
+            local.waited = getattr(local, "waited", 0.0) + elapsed
+    return wrapper
+
+# A subclass of cls with methods timed under cls's name
+def profiled_class(cls, methods):
+    key = (cls, methods)
+    profiled = profiled_classes.get(key)
+    if profiled is None:
+        namespace = {method: timed(f"{cls.__name__}.{method}", getattr(cls, method))
+                     for method in methods}
+        profiled = profiled_classes[key] = type(f"Profiled{cls.__name__}", (cls,), namespace)
+    return profiled
+
+# Wraps an __init__ so the instance's game is profiled once it is set up
+def game_timed(init, methods):
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self.game.__class__ = profiled_class(type(self.game), methods)
+    return wrapper
+
+WRAPPERS = {"timer": timed, "turn": turn_timed, "wait": wait_timed}
+
+# Wrap the TARGETS methods of every loaded module; no-op unless enabled
+def instrument():
+    if not enabled:
+        return
+    for module_name, class_name, kind, methods in TARGETS:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        cls = getattr(module, class_name)
+        if kind == "game":
+            key = (module_name, class_name, "__init__")
+            if key not in patched:
+                patched.add(key)
+                cls.__init__ = game_timed(cls.__init__, methods)
+                count("instrumented methods", len(methods))
+            continue
+        for method in methods:
+            key = (module_name, class_name, method)
+            if key in patched:
+                continue
+            patched.add(key)
+            name = f"{class_name}.{method}"
+            setattr(cls, method, WRAPPERS[kind](name, getattr(cls, method)))
+            count("instrumented methods")
+
+def snapshot():
+    return {"timers": {name: hist.to_dict() for name, hist in sorted(timers.items()) if hist.count},
+            "counters": dict(counters)}
+
+def report():
+    lines = [f"{'timer':<42}{'calls':>8}{'total ms':>11}{'mean ms':>10}{'p99 ms':>9}{'max ms':>9}"]
+    for name, hist in sorted(timers.items(), key=lambda item: -item[1].total):
+        if hist.count:
+            stats = hist.to_dict()
+            lines.append(f"{name:<42}{hist.count:>8}{stats['total_ms']:>11.2f}{stats['mean_ms']:>10.3f}"
+                         f"{stats['p99_ms']:>9.3f}{stats['max_ms']:>9.3f}")
+    turns = timers.get("turn")
+    if turns is not None and turns.count:
+        lines.append("turn latency (excluding dialogs):")
+        widest = max(turns.buckets.values())
+        for bucket, n in sorted(turns.buckets.items()):
+            label = f"< {2 ** bucket / 1000:g} ms"
+            lines.append(f"  {label:>14} {n:>6} {'#' * max(1, n * 40 // widest)}")
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
+
+# Print the summary, and write it as JSON to path when given
+def dump(path=None, stream=None):
+    print(report(), file=stream or sys.stdout)
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(snapshot(), f, indent=2)
@@ -0,0 +1,206 @@
+# UnoSave.py
+# Saved games and checkpoints. Each game is stored as the START record
+# UnoLog writes at the beginning of a game (the full snapshot: piles, hands,
+# turn and super card state), so loading is a byte decode and
+# UnoGame.from_snapshot. A file can hold any number of games, e.g. every
+# table of a server, and is memory-mapped for bulk loads.
+#
+# Files are written to a uniquely named temporary file next to the target,
+# synced and then renamed over it, and the rename is synced too (POSIX), so a
+# crash leaves either the previous save or the new one, never a mix.
+#
+# File layout: MAGIC, VERSION, then entries back to back:
+#   name length (2 bytes, little-endian), name (JSON, UTF-8),
+#   turns (4 bytes, little-endian), UnoLog START record
+# The RNG is not saved; a loaded game shuffles with the rng it is given.
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from UnoGame import UnoGame, UnoGameObserver
+from UnoLog import START, encode_snapshot, decode_snapshot
+
+MAGIC = b"UNOS"
+VERSION = 1
+NAME_SIZE = struct.Struct("<H")
+TURNS = struct.Struct("<I")
+
+def encode_game(game, name=None, turns=0):
+    key = json.dumps(name).encode()
+    return NAME_SIZE.pack(len(key)) + key + TURNS.pack(turns) + encode_snapshot(game.snapshot())
+
+def write_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except FileNotFoundError:
+            pass
+        raise
+    if os.name == "posix":  # Directories cannot be opened for fsync on Windows
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+# entries are (name, turns, game)
+def save_games(path, entries):
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    for name, turns, game in entries:
+        out += encode_game(game, name, turns)
+    write_atomic(path, out)
+
+def save_game(path, game, turns=0):
+    save_games(path, [(None, turns, game)])
+
+# (name, turns, snapshot) for each entry in data (bytes or mmap)
+def read_entries(data):
+    if len(data) <= len(MAGIC) or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a save file")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"unsupported save file version {data[len(MAGIC)]}")
+    pos = len(MAGIC) + 1
+    end = len(data)
+    try:
+        while pos < end:
+            (size,) = NAME_SIZE.unpack_from(data, pos)
+            name = json.loads(bytes(data[pos + 2:pos + 2 + size]))
+            pos += 2 + size
+            (turns,) = TURNS.unpack_from(data, pos)
+            pos += TURNS.size
+            if data[pos] != START:
+                raise ValueError(f"bad entry at byte {pos}")
+            snapshot, pos = decode_snapshot(data, pos + 1)
+            yield name, turns, snapshot
+    except (IndexError, struct.error):
+        raise ValueError("truncated save file") from None
+
+# The first game in a save file, as (game, turns)
+def load_game(path, rng=None):
+    with open(path, "rb") as f:
+        data = f.read()
+    for name, turns, snapshot in read_entries(data):
+        return UnoGame.from_snapshot(snapshot, rng), turns
+    raise ValueError("empty save file")
+
+# Every game in a save file, read through a memory map, as (name, turns, game)
+def load_games(path):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for name, turns, snapshot in read_entries(data):
+                yield name, turns, UnoGame.from_snapshot(snapshot)
+
+# Saves a game to `path` at the end of every `interval`-th turn, and removes
+# the file once the game has been won so a finished game is not resumed.
+# turns starts the count for a game that was itself loaded from a save.
+class Checkpointer(UnoGameObserver):
+    def __init__(self, game, path, interval=1, turns=0):
+        if interval < 1:
+            raise ValueError(f"checkpoint interval must be at least 1, not {interval}")
+        self.game = game
+        self.path = path
+        self.interval = interval
+        self.turns = turns
+        self.saves = 0
+        self.save_seconds = 0.0
+        game.add_observer(self)
+
+    def detach(self):
+        self.game.remove_observer(self)
+
+    def on_turn_ended(self, player_index):
+        self.turns += 1
+        if self.game.check_winner() != -1:
+            self.discard()
+        elif self.turns % self.interval == 0:
+            self.save()
+
+    def save(self):
+        start = time.perf_counter()
+        save_game(self.path, self.game, self.turns)
+        self.saves += 1
+        self.save_seconds += time.perf_counter() - start
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+# bench: save a batch of games part-way through in one file and time the
+# write, a single-game load and a memory-mapped load of the whole file;
+# show: list the games in a save file
+def main(argv=None):
+    from UnoBots import simple_policy
+
+    parser = argparse.ArgumentParser(description="Save files: size and load time, or list one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench")
+    bench.add_argument("path")
+    bench.add_argument("--games", type=int, default=5000)
+    bench.add_argument("--players", type=int, default=4)
+    bench.add_argument("--turns", type=int, default=20, help="turns played before saving")
+    bench.add_argument("--seed", type=int, default=0)
+    show = commands.add_parser("show")
+    show.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        for name, turns, game in load_games(args.path):
+            sizes = ", ".join(str(len(hand)) for hand in game.players)
+            print(f"{json.dumps(name)}: turn {turns}, seat {game.current_player + 1} to move, "
+                  f"top {game.top_card}, hands {sizes}")
+        return 0
+
+    games = []
+    for i in range(args.games):
+        game = UnoGame(args.players, rng=random.Random(f"{args.seed}/{i}"))
+        for _ in range(args.turns):
+            game.take_turn(simple_policy(game, game.current_player))
+            if game.check_winner() != -1:
+                break
+        games.append((f"table-{i}", args.turns, game))
+
+    start = time.perf_counter()
+    save_games(args.path, games)
+    write_seconds = time.perf_counter() - start
+    size = os.path.getsize(args.path)
+
+    single = f"{args.path}.one"
+    save_game(single, games[0][2], args.turns)
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        game, _ = load_game(single)
+    single_us = (time.perf_counter() - start) / runs * 1e6
+    os.remove(single)
+    if game.snapshot() != games[0][2].snapshot():
+        raise AssertionError("loaded game differs from the saved one")
+
+    start = time.perf_counter()
+    loaded = sum(1 for _ in load_games(args.path))
+    bulk_seconds = time.perf_counter() - start
+
+    print(f"{args.games} games, {size} bytes ({size / args.games:.0f} bytes/game)")
+    print(f"save all:  {write_seconds * 1000:.1f} ms (atomic write and rename)")
+    print(f"load one:  {single_us:.1f} us (open, decode, from_snapshot)")
+    print(f"load all:  {bulk_seconds * 1000:.1f} ms via mmap, {bulk_seconds / loaded * 1e6:.1f} us/game")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
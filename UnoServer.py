@@ -0,0 +1,444 @@
+# UnoServer.py
+# Asyncio table server: many headless UnoGame tables behind one TCP port.
+# Messages are JSON objects, one per line, each with a client-chosen "id"
+# that the reply echoes; one connection can drive any number of tables and
+# replies come back as soon as each table has handled the request.
+#
+# Every table has its own queue and task, so a table's moves are applied one
+# at a time without locks. Moves are validated through play_card,
+# draw_card and draw_super_card. A sweeper evicts tables idle for longer
+# than idle_timeout; finished tables are removed at once. With a state
+# file (serve --state) the tables are loaded from it at start-up and saved
+# to it, atomically, every so many moves and on shutdown (UnoSave).
+#
+# Requests: {"op": "open", "table", "players", "seed"?}, {"op": "view",
+# "table"}, {"op": "play", "table", "seat", "index", "color"?},
+# {"op": "draw"|"super", "table", "seat"}, {"op": "close", "table"},
+# {"op": "watch", "table", "seat"?}, {"op": "stats"}. Replies carry "ok"
+# and either the result or "error". After a watch, the connection also
+# gets the table's UnoBroadcast keyframes and deltas as lines without an
+# "id", filtered for the seat (or for spectators without one).
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from UnoGame import UnoGame, WILD_TYPES
+from UnoBots import WILD_COLORS
+from UnoBroadcast import StateBroadcaster
+from UnoSave import save_games, load_games
+
+MOVE_OPS = ("play", "draw", "super")
+
+# Move latencies in seconds. count covers every move; percentiles are over
+# the most recent `window` of them, so memory and the sort stay bounded on a
+# long-running server.
+class LatencyStats:
+    def __init__(self, window=65536):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def clear(self):
+        self.samples.clear()
+        self.count = 0
+
+# JSON true/false are ints to isinstance; seats and card indexes must not be
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+# game continues a loaded game instead of dealing a new one
+class Table:
+    def __init__(self, server, name, players, seed=None, game=None, moves=0):
+        self.server = server
+        self.name = name
+        self.game = game if game is not None else UnoGame(players, rng=random.Random(seed))
+        self.queue = asyncio.Queue()
+        self.last_active = time.monotonic()
+        self.moves = moves
+        self.broadcaster = None  # Created by the first watcher
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        try:
+            while True:
+                request, connection, received = await self.queue.get()
+                try:
+                    reply = self.handle(request, connection)
+                except Exception as e:
+                    # One bad request must not end the table and strand
+                    # the requests queued behind it
+                    reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                if request["op"] in MOVE_OPS:
+                    self.server.move_latency.add(time.perf_counter() - received)
+                connection.send(request, reply)
+        except asyncio.CancelledError:
+            # Closed, finished or evicted: answer whatever is still queued
+            while not self.queue.empty():
+                request, connection, _ = self.queue.get_nowait()
+                connection.send(request, {"ok": False, "error": "table closed"})
+            raise
+
+    def handle(self, request, connection):
+        self.last_active = time.monotonic()
+        op = request["op"]
+        game = self.game
+        if op == "view":
+            seat = game.current_player
+            return {"ok": True, "seat": seat, "hand": [card.id for card in game.players[seat]],
+                    "legal": game.legal_moves(seat), "top": game.top_card.id,
+                    "super_left": len(game.super_deck)}
+        if op == "close":
+            self.server.remove_table(self)
+            return {"ok": True}
+        if op == "watch":
+            view = request.get("seat")
+            if view is not None and not (is_int(view) and 0 <= view < game.num_players):
+                return {"ok": False, "error": "no such seat"}
+            if self.broadcaster is None:
+                self.broadcaster = StateBroadcaster(game)
+            self.broadcaster.subscribe(view, connection.send_bytes)
+            return {"ok": True}
+
+        if op not in MOVE_OPS:
+            return {"ok": False, "error": f"unknown op {op}"}
+        seat = request.get("seat")
+        if not is_int(seat) or seat != game.current_player:
+            return {"ok": False, "error": f"not seat {seat}'s turn"}
+        if op == "play":
+            index = request.get("index")
+            hand = game.players[seat]
+            if not is_int(index) or not 0 <= index < len(hand):
+                return {"ok": False, "error": "no such card"}
+            color = request.get("color")
+            if hand[index].type in WILD_TYPES and color not in WILD_COLORS:
+                return {"ok": False, "error": "a wild card needs a colour"}
+            success, message = game.play_card(seat, index)
+            if not success:
+                return {"ok": False, "error": message}
+            if message == "Color selection needed.":
+                game.choose_new_color(color)
+        elif op == "draw":
+            success, message = game.draw_card(seat)
+        else:
+            success, message = game.draw_super_card(seat)
+            if not success:
+                return {"ok": False, "error": message}
+        game.end_turn()
+        self.moves += 1
+        self.server.moves += 1
+        winner = game.check_winner()
+        if winner != -1:
+            self.server.remove_table(self)
+            return {"ok": True, "winner": winner}
+        return {"ok": True, "next": game.current_player}
+
+# One client connection; replies are written as tables produce them
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+
+    def send(self, request, reply):
+        reply["id"] = request.get("id")
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(reply).encode() + b"\n")
+
+    # Pushed broadcast lines; False once the client has gone
+    def send_bytes(self, data):
+        if self.writer.is_closing():
+            return False
+        self.writer.write(data)
+        return True
+
+class TableServer:
+    def __init__(self, idle_timeout=60.0, max_tables=100000):
+        self.idle_timeout = idle_timeout
+        self.max_tables = max_tables
+        self.tables = {}
+        self.moves = 0
+        self.evicted = 0
+        self.move_latency = LatencyStats()
+        self.server = None
+        self.sweeper = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.sweeper = asyncio.create_task(self.sweep())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.sweeper.cancel()
+        for table in list(self.tables.values()):
+            self.remove_table(table)
+        self.server.close()
+        await self.server.wait_closed()
+
+    def remove_table(self, table):
+        if self.tables.get(table.name) is table:
+            del self.tables[table.name]
+            # A table removes itself from inside its own task; that task
+            # finishes the current request and is then cancelled
+            table.task.cancel()
+
+    # Evict tables that have not been used for idle_timeout seconds
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            cutoff = time.monotonic() - self.idle_timeout
+            for table in [t for t in self.tables.values() if t.last_active < cutoff]:
+                self.remove_table(table)
+                self.evicted += 1
+
+    async def handle_connection(self, reader, writer):
+        connection = Connection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                    op = request["op"]
+                except (ValueError, KeyError, TypeError):
+                    connection.send({}, {"ok": False, "error": "bad request"})
+                    continue
+                try:
+                    self.dispatch(request, connection, received)
+                except Exception as e:
+                    connection.send(request, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()  # Only wait on slow readers
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, request, connection, received):
+        op = request["op"]
+        if op == "open":
+            connection.send(request, self.open_table(request))
+        elif op == "stats":
+            connection.send(request, self.stats())
+        else:
+            name = request.get("table")
+            table = self.tables.get(name) if isinstance(name, str) else None
+            if table is None:
+                connection.send(request, {"ok": False, "error": "no such table"})
+            else:
+                table.queue.put_nowait((request, connection, received))
+
+    def open_table(self, request):
+        name = request.get("table")
+        if not isinstance(name, str):
+            return {"ok": False, "error": "table must be a string"}
+        if name in self.tables:
+            return {"ok": False, "error": "table exists"}
+        if len(self.tables) >= self.max_tables:
+            return {"ok": False, "error": "server full"}
+        players = request.get("players", 4)
+        if not is_int(players) or not 2 <= players <= 10:
+            return {"ok": False, "error": "2 to 10 players"}
+        seed = request.get("seed")
+        if seed is not None and not is_int(seed):
+            return {"ok": False, "error": "seed must be an integer"}
+        self.tables[name] = Table(self, name, players, seed)
+        return {"ok": True}
+
+    # Every open table, with its move count, in one UnoSave file. Moves are
+    # applied synchronously inside the tables' tasks, so each game is at a
+    # turn boundary here.
+    def save_tables(self, path):
+        save_games(path, [(table.name, table.moves, table.game) for table in self.tables.values()])
+
+    # Open the tables saved in path (skipping names already open); returns
+    # how many were loaded. Needs the running event loop.
+    def load_tables(self, path):
+        loaded = 0
+        for name, moves, game in load_games(path):
+            if name not in self.tables and len(self.tables) < self.max_tables:
+                self.tables[name] = Table(self, name, game.num_players, game=game, moves=moves)
+                loaded += 1
+        return loaded
+
+    def stats(self):
+        return {"ok": True, "tables": len(self.tables), "moves": self.moves, "evicted": self.evicted,
+                "p50_ms": self.move_latency.percentile(0.5) * 1000,
+                "p99_ms": self.move_latency.percentile(0.99) * 1000}
+
+# Client side of the protocol with request ids, for the load generator
+class TableClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.pending = {}
+        self.pushed_bytes = 0
+        self.listener = asyncio.create_task(self.listen())
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            if "id" not in reply:
+                self.pushed_bytes += len(line)  # A watched table's broadcast
+                continue
+            future = self.pending.pop(reply["id"], None)
+            if future is not None:
+                future.set_result(reply)
+
+    async def call(self, **request):
+        self.next_id += 1
+        request["id"] = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        return await future
+
+    async def close(self):
+        self.listener.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+# Keep one table busy until the deadline: fetch the view, make a random
+# legal move, start a new game when one ends. Move round trips go into
+# latency. Each game gets `watchers` spectators on the same connection.
+async def drive_table(client, name, players, rng, deadline, latency, watchers=0):
+    async def open_table():
+        await client.call(op="open", table=name, players=players, seed=rng.getrandbits(32))
+        for _ in range(watchers):
+            await client.call(op="watch", table=name)
+
+    games = 0
+    await open_table()
+    while time.perf_counter() < deadline:
+        view = await client.call(op="view", table=name)
+        if view["legal"]:
+            index = rng.choice(view["legal"])
+            request = {"op": "play", "index": index, "color": rng.choice(WILD_COLORS)}
+        elif view["super_left"] and rng.random() < 0.3:
+            request = {"op": "super"}
+        else:
+            request = {"op": "draw"}
+        start = time.perf_counter()
+        reply = await client.call(table=name, seat=view["seat"], **request)
+        latency.add(time.perf_counter() - start)
+        if not reply["ok"]:
+            raise RuntimeError(f"{name}: {reply['error']}")
+        if "winner" in reply:
+            games += 1
+            await open_table()
+    await client.call(op="close", table=name)
+    return games
+
+async def run_load(host, port, tables, connections, players, seconds, watchers=0, seed=0):
+    rng = random.Random(seed)
+    clients = [await TableClient.connect(host, port) for _ in range(connections)]
+    latency = LatencyStats()
+    start = time.perf_counter()
+    deadline = start + seconds
+    games = await asyncio.gather(*(
+        drive_table(clients[i % connections], f"load-{seed}-{i}", players,
+                    random.Random(rng.getrandbits(64)), deadline, latency, watchers)
+        for i in range(tables)))
+    elapsed = time.perf_counter() - start
+    stats = await clients[0].call(op="stats")
+    pushed = sum(client.pushed_bytes for client in clients)
+    for client in clients:
+        await client.close()
+    moves = latency.count
+    print(f"{tables} tables over {connections} connections, {elapsed:.1f} s: "
+          f"{moves} moves ({moves / elapsed:.0f} moves/s), {sum(games)} games finished")
+    print(f"move round trip: p50 {latency.percentile(0.5) * 1000:.2f} ms, "
+          f"p99 {latency.percentile(0.99) * 1000:.2f} ms")
+    if watchers:
+        print(f"broadcasts: {pushed / max(moves, 1):.0f} bytes/move to {watchers} watchers per table")
+    print(f"server: {stats['moves']} moves, handling p99 {stats['p99_ms']:.2f} ms "
+          f"(queue wait included), {stats['evicted']} tables evicted")
+
+async def serve(host, port, idle_timeout, state_path=None, checkpoint_moves=1000):
+    server = TableServer(idle_timeout)
+    if state_path is not None and os.path.exists(state_path):
+        start = time.perf_counter()
+        loaded = server.load_tables(state_path)
+        print(f"loaded {loaded} tables from {state_path} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    port = await server.start(host, port)
+    print(f"serving tables on {host}:{port}")
+    if state_path is None:
+        await asyncio.Event().wait()
+    saved_at = server.moves
+    try:
+        while True:
+            await asyncio.sleep(1)
+            if server.moves - saved_at >= checkpoint_moves:
+                saved_at = server.moves
+                server.save_tables(state_path)
+    finally:
+        server.save_tables(state_path)
+
+# Server and load generator in one process, on an ephemeral port
+async def bench(tables, connections, players, seconds, watchers, idle_timeout):
+    server = TableServer(idle_timeout)
+    port = await server.start("127.0.0.1", 0)
+    try:
+        await run_load("127.0.0.1", port, tables, connections, players, seconds, watchers)
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Uno tables over TCP, or load-test a server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "load", "bench"):
+        command = commands.add_parser(name)
+        if name != "bench":
+            command.add_argument("--host", default="127.0.0.1")
+            command.add_argument("--port", type=int, default=8765)
+        if name != "load":
+            command.add_argument("--idle", type=float, default=60.0, help="evict tables idle this long")
+        if name == "serve":
+            command.add_argument("--state", default=None, help="load tables from and save them to this file")
+            command.add_argument("--checkpoint-moves", type=int, default=1000,
+                                 help="save the tables after this many moves")
+        if name != "serve":
+            command.add_argument("--tables", type=int, default=1000)
+            command.add_argument("--connections", type=int, default=16)
+            command.add_argument("--players", type=int, default=4)
+            command.add_argument("--seconds", type=float, default=10.0)
+            command.add_argument("--watchers", type=int, default=0, help="spectators per table")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.host, args.port, args.idle, args.state, args.checkpoint_moves))
+        elif args.command == "load":
+            asyncio.run(run_load(args.host, args.port, args.tables, args.connections,
+                                 args.players, args.seconds, args.watchers))
+        else:
+            asyncio.run(bench(args.tables, args.connections, args.players, args.seconds,
+                              args.watchers, args.idle))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# UnoTournament.py
+# Runs many headless games between bots across a process pool. Every game
+# gets its own RNG streams derived from the master seed and the game index,
+# so results depend only on the seed and never on how many workers ran them.
+import argparse
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from UnoGame import UnoGame
+from UnoBots import BOTS, play_game
+
+# Independent, reproducible RNG for one purpose ("deck", "bots", ...) of one
+# game; string seeds are hashed with SHA-512, so this is stable across runs
+def game_rng(master_seed, game_index, purpose):
+    return random.Random(f"{master_seed}/{game_index}/{purpose}")
+
+# Seat -> bot name for one game. With rotate, the lineup shifts one seat per
+# game so every bot plays every seat equally often.
+def seat_lineup(lineup, game_index, rotate):
+    if not rotate:
+        return list(lineup)
+    shift = game_index % len(lineup)
+    return list(lineup[shift:] + lineup[:shift])
+
+# Play game number game_index; runs in the worker processes
+def run_game(job):
+    master_seed, game_index, lineup, rotate, max_turns = job
+    names = seat_lineup(lineup, game_index, rotate)
+    game = UnoGame(len(names), rng=game_rng(master_seed, game_index, "deck"))
+    bot_rng = game_rng(master_seed, game_index, "bots")
+    bots = [BOTS[name](bot_rng) for name in names]
+    winner, turns = play_game(game, bots, max_turns)
+    return game_index, names, winner, turns
+
+class TournamentResult:
+    def __init__(self, lineup):
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self.seat_wins = [0] * len(lineup)
+        self.bot_games = {name: 0 for name in lineup}
+        self.bot_wins = {name: 0 for name in lineup}
+
+    def add(self, names, winner, turns):
+        self.games += 1
+        self.turns += turns
+        for name in set(names):
+            self.bot_games[name] += 1
+        if winner == -1:
+            self.unfinished += 1
+        else:
+            self.seat_wins[winner] += 1
+            self.bot_wins[names[winner]] += 1
+
+    def seat_win_rates(self):
+        return [wins / max(self.games, 1) for wins in self.seat_wins]
+
+    # Wins per game the bot took part in (a bot in two seats can win either)
+    def bot_win_rates(self):
+        return {name: self.bot_wins[name] / max(self.bot_games[name], 1) for name in self.bot_wins}
+
+    def summary(self):
+        lines = [f"{self.games} games, {self.unfinished} unfinished, "
+                 f"{self.turns / max(self.games, 1):.1f} turns/game"]
+        for seat, rate in enumerate(self.seat_win_rates()):
+            lines.append(f"  seat {seat + 1}: {rate:.3%}")
+        for name, rate in self.bot_win_rates().items():
+            lines.append(f"  {name}: {rate:.3%}")
+        return "\n".join(lines)
+
+# Yield (game_index, seat names, winner, turns) for every game as workers
+# finish them. workers=1 plays in this process.
+def stream_games(num_games, lineup, seed=0, workers=None, rotate=True, max_turns=5000, chunksize=64):
+    jobs = ((seed, i, tuple(lineup), rotate, max_turns) for i in range(num_games))
+    if workers == 1:
+        yield from map(run_game, jobs)
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(run_game, jobs, chunksize=chunksize)
+
+def tournament(num_games, lineup, seed=0, workers=None, rotate=True, max_turns=5000, on_result=None):
+    result = TournamentResult(lineup)
+    for game_index, names, winner, turns in stream_games(num_games, lineup, seed, workers, rotate, max_turns):
+        result.add(names, winner, turns)
+        if on_result is not None:
+            on_result(game_index, names, winner, turns)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a headless bot tournament.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--bots", nargs="+", default=["simple", "random", "simple", "random"],
+                        choices=sorted(BOTS), help="bot name per seat")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--no-rotate", action="store_true", help="keep each bot in its seat")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = tournament(args.games, args.bots, args.seed, args.workers, not args.no_rotate)
+    elapsed = time.perf_counter() - start
+    print(result.summary())
+    print(f"{elapsed:.2f}s, {result.games / elapsed:.0f} games/s")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,516 @@
+# UnoWindow.py
+# The game window and its widgets. main.py imports this module only when a
+# game starts, so the menu comes up without loading QtMultimedia, the rules
+# engine or the bots. The game itself runs on a GameWorker thread
+# (UnoWorker); the window sends it moves and redraws from its TurnStates.
+from PySide6.QtWidgets import (
+    QApplication, QLabel, QVBoxLayout, QWidget, QPushButton, QDialog,
+    QHBoxLayout, QMessageBox, QSizePolicy
+)
+from PySide6.QtGui import QPixmap, QPainter, QFont
+from PySide6.QtCore import Qt, QUrl, QTimer
+import os, time, threading, multiprocessing
+from collections import deque
+from UnoGame import UnoGame
+from UnoMCTS import MCTSBot
+from UnoWorker import GameWorker
+from UnoAssets import CardImageCache, HAND_CARD_SIZE, BACKGROUND_PATH, WINDOW_SIZE
+from UnoAudio import SoundEngine
+
+BOT_TIME_BUDGET = 1.0  # Seconds a computer seat thinks per move
+BOT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))  # Search processes shared by the computer seats
+
+# Paint-time statistics for one widget, in milliseconds
+class FrameStats:
+    def __init__(self, name, recent=240):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.worst = max(self.worst, ms)
+        self.recent.append(ms)
+
+    def report(self):
+        if not self.count:
+            return f"{self.name}: no frames"
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+        return (f"{self.name}: {self.count} frames, avg {self.total / self.count:.3f} ms, "
+                f"p95 {p95:.3f} ms, max {self.worst:.3f} ms")
+
+class ColorDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Choose a Color")
+        self.selected_color = None
+
+        layout = QVBoxLayout()
+        button_layout = QHBoxLayout()
+
+        # Buttons for each color
+        colors = ['red', 'blue', 'green', 'yellow']
+        for color in colors:
+            button = QPushButton(color.capitalize())
+            button.setStyleSheet(f'background-color: {color}')
+            button.clicked.connect(lambda _, c=color: self.set_color(c))
+            button_layout.addWidget(button)
+
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def set_color(self, color):
+        self.selected_color = color
+        self.accept()
+
+# The current player's hand as one custom-painted widget. Cards overlap
+# more as the hand grows (down to MIN_SPACING), after which the row scrolls
+# with the mouse wheel. Only cards inside the damaged region are painted and
+# clicks are hit-tested arithmetically, so cost does not grow with the hand.
+class CardHandWidget(QWidget):
+    CARD_WIDTH, CARD_HEIGHT = HAND_CARD_SIZE
+    SPACING = 90  # Card pitch when there is room for the whole hand
+    MIN_SPACING = 28
+    MARGIN = 5
+    RAISE = 12  # How far the selected card lifts
+
+    def __init__(self, card_images, parent=None):
+        super().__init__(parent)
+        self.card_images = card_images
+        self.cards = ()
+        self.selected = None  # card_index of the selected card
+        self.scroll = 0
+        self.setMinimumHeight(self.CARD_HEIGHT + self.RAISE + 2 * self.MARGIN)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def set_hand(self, cards):
+        self.cards = tuple(cards)
+        self.selected = None
+        self.scroll = min(self.scroll, self.max_scroll())
+        self.update()
+
+    # Index of the selected card, or None
+    def selected_index(self):
+        return self.selected
+
+    def spacing(self):
+        if len(self.cards) < 2:
+            return self.SPACING
+        room = (self.width() - 2 * self.MARGIN - self.CARD_WIDTH) / (len(self.cards) - 1)
+        return max(self.MIN_SPACING, min(self.SPACING, room))
+
+    def content_width(self):
+        if not self.cards:
+            return 0
+        return self.spacing() * (len(self.cards) - 1) + self.CARD_WIDTH + 2 * self.MARGIN
+
+    def max_scroll(self):
+        return max(0, int(self.content_width() - self.width()))
+
+    def card_left(self, index, spacing):
+        return self.MARGIN + index * spacing - self.scroll
+
+    # Topmost card under x (later cards overlap earlier ones), or None
+    def card_at(self, x):
+        if not self.cards:
+            return None
+        spacing = self.spacing()
+        index = min(len(self.cards) - 1, int((x + self.scroll - self.MARGIN) // spacing))
+        if index < 0 or x >= self.card_left(index, spacing) + self.CARD_WIDTH:
+            return None
+        return index
+
+    def paintEvent(self, event):
+        if not self.cards:
+            return
+        painter = QPainter(self)
+        clip = event.rect()
+        spacing = self.spacing()
+        # Cards whose span [left, left + CARD_WIDTH) meets the damaged region
+        first = max(0, int((clip.left() + self.scroll - self.MARGIN - self.CARD_WIDTH) // spacing) + 1)
+        last = min(len(self.cards) - 1, int((clip.right() + self.scroll - self.MARGIN) // spacing))
+        for index in range(first, last + 1):
+            top = self.MARGIN + (0 if index == self.selected else self.RAISE)
+            pixmap = self.card_images.card_pixmap(self.cards[index], self.CARD_WIDTH, self.CARD_HEIGHT)
+            painter.drawPixmap(int(self.card_left(index, spacing)), top, pixmap)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        index = self.card_at(event.position().x())
+        if index is not None:
+            self.selected = None if index == self.selected else index
+            self.update()
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y() or event.angleDelta().x()
+        scroll = max(0, min(self.max_scroll(), self.scroll - delta // 2))
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self.update()
+
+    def resizeEvent(self, event):
+        self.scroll = min(self.scroll, self.max_scroll())
+        super().resizeEvent(event)
+
+class UnoGameWindow(QWidget):
+    # seat_types has "human" or "computer" per seat (default: all human).
+    # card_images, background and sounds (a SoundEngine) come from
+    # StartMenu's preloader when it ran. sound=False creates no audio
+    # objects; frame_stats prints paint timings on close; on_first_frame is
+    # called once the window has first painted.
+    # log_path appends the game to a UnoLog game log. save_path resumes the
+    # game saved there, if any, and checkpoints it every checkpoint_every
+    # turns and on close (UnoSave). Esc cancels a computer seat's move and
+    # holds the computer seats until it is pressed again.
+    def __init__(self, num_players=4, seat_types=None, card_images=None, background=None,
+                 sound=True, frame_stats=False, on_first_frame=None, log_path=None,
+                 save_path=None, checkpoint_every=1, sounds=None):
+        super().__init__()
+        self.frame_stats = frame_stats
+        self.on_first_frame = on_first_frame
+        game, turns = None, 0
+        if save_path is not None and os.path.exists(save_path):
+            from UnoSave import load_game
+            try:
+                game, turns = load_game(save_path)
+                num_players = game.num_players
+            except (OSError, ValueError) as e:
+                print(f"could not resume {save_path}: {e}")
+        if game is None:
+            game = UnoGame(num_players)
+        self.checkpoints = None
+        if save_path is not None:
+            from UnoSave import Checkpointer
+            self.checkpoints = Checkpointer(game, save_path, checkpoint_every, turns)
+        self.game_log = None
+        if log_path is not None:
+            from UnoLog import GameLogWriter, GameRecorder
+            self.game_log = GameLogWriter(log_path)
+            GameRecorder(game, self.game_log)
+        self.num_players = num_players
+        self.card_images = card_images if card_images is not None else CardImageCache()
+        seat_types = list(seat_types or [])[:num_players]
+        seat_types += ["human"] * (num_players - len(seat_types))
+        stop = threading.Event()
+        # The computer seats search in other processes, so their search
+        # never holds this process's GIL while the window paints. Spawned,
+        # not forked: forking a process that runs Qt is not safe.
+        self.bot_pool = None
+        if "computer" in seat_types:
+            self.bot_pool = multiprocessing.get_context("spawn").Pool(BOT_WORKERS)
+        self.seat_bots = [MCTSBot(BOT_TIME_BUDGET, workers=BOT_WORKERS, stop=stop, pool=self.bot_pool)
+                          if seat == "computer" else None for seat in seat_types]
+        self.worker = GameWorker(game, self.seat_bots, stop)
+        self.state = self.worker.state()  # Latest TurnState; the window never touches the game
+        self.shown_seq = self.state.seq  # seq of the state the widgets show
+        self.refresh_pending = False
+        self.bots_paused = False
+        self.worker.state_changed.connect(self.on_state_changed)
+        self.worker.rejected.connect(self.on_move_rejected)
+        self.worker.cancelled.connect(self.on_move_cancelled)
+
+        # Set up background and music
+        self.scaled_background = None  # background_image at the window size, rebuilt on resize
+        if background is not None and background["background"] is not None:
+            self.background_image = QPixmap.fromImage(background["background"])
+            if background["scaled_background"] is not None:
+                self.scaled_background = QPixmap.fromImage(background["scaled_background"])
+        else:
+            self.background_image = QPixmap(BACKGROUND_PATH)
+        self.paint_stats = FrameStats("window paint")
+
+        if sound:
+            from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+            self.background_music_player = QMediaPlayer()
+            self.background_audio_output = QAudioOutput()
+            self.background_music_player.setAudioOutput(self.background_audio_output)
+            self.background_audio_output.setVolume(0.05)
+            self.setup_background_music()
+
+        # Sound effects are decoded once and replayed from memory
+        self.sounds = sounds if sounds is not None else SoundEngine(enabled=sound)
+
+        self.init_ui()
+        self.worker.start()
+
+    def setup_background_music(self):
+        music_file_path = os.path.join(os.getcwd(), "sounds", "backgroundMusic.wav")
+        self.background_music_player.setSource(QUrl.fromLocalFile(music_file_path))
+        self.background_music_player.setLoops(self.background_music_player.Loops.Infinite)
+        self.background_music_player.play()
+
+    def play_sound_effect(self, sound_file):
+        self.sounds.play(sound_file)
+
+    # Winner cheering audio
+    def play_cheering_sound(self):
+        self.sounds.play("Winner.wav")
+
+    # A move finished on the worker. Sounds play at once; the widgets are
+    # redrawn once from the latest state however many moves arrive before
+    # the event loop gets to it.
+    def on_state_changed(self, state):
+        self.state = state
+        for cue in state.cues:
+            self.play_sound_effect(cue)
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def on_move_rejected(self, title, message):
+        QMessageBox.warning(self, title, message)
+
+    def on_move_cancelled(self, seat):
+        self.status_label.setText(f"Player {seat + 1}'s move cancelled (Esc to resume)")
+
+    def init_ui(self):
+        self.setWindowTitle("Uno Game")
+        self.setGeometry(100, 100, *WINDOW_SIZE)  # Width x Height
+
+        # Main layout
+        main_layout = QVBoxLayout()
+
+        # Top layout: Deck and Discard Pile
+        top_layout = QHBoxLayout()
+
+        # Deck
+        self.deck_label = QLabel(self)
+        deck_pixmap = self.card_images.pixmap("back", 100, 150)
+        self.deck_label.setPixmap(deck_pixmap)
+        self.deck_label.setAlignment(Qt.AlignCenter)
+        self.deck_label.setCursor(Qt.PointingHandCursor)  # Change cursor to pointer
+        self.deck_label.mousePressEvent = self.on_deck_clicked  # Connect click event
+        top_layout.addWidget(self.deck_label)
+
+        self.super_deck_label = QLabel(self)
+        super_deck_pixmap = self.card_images.pixmap("super_card_back", 100, 150)
+        self.super_deck_label.setPixmap(super_deck_pixmap)
+        self.super_deck_label.setAlignment(Qt.AlignCenter)
+        self.super_deck_label.setCursor(Qt.PointingHandCursor)  # Change cursor to pointer
+        self.super_deck_label.mousePressEvent = self.on_super_deck_clicked  # Connect click event
+        top_layout.addWidget(self.super_deck_label)
+
+        # Discard Pile
+        self.discard_label = QLabel(self)
+        self.discard_label.setAlignment(Qt.AlignCenter)
+        self.update_discard_pile()
+        top_layout.addWidget(self.discard_label)
+
+        main_layout.addLayout(top_layout)
+
+        # Middle layout: Current Player and Instructions
+        middle_layout = QHBoxLayout()
+
+        # Current Player Info
+        self.current_player_label = QLabel(self)
+        self.update_current_player_label()
+        middle_layout.addWidget(self.current_player_label)
+
+        # Game Status
+        self.status_label = QLabel(" ") #Game Started!
+        middle_layout.addWidget(self.status_label)
+
+        main_layout.addLayout(middle_layout)
+
+        # Player's Hand
+        self.hand_view = CardHandWidget(self.card_images, self)
+        self.update_player_hand()
+        main_layout.addWidget(self.hand_view)
+
+        # Action Buttons
+        action_layout = QHBoxLayout()
+
+        # Play Selected Card
+        self.play_button = QPushButton('Play Selected Card', self)
+        self.play_button.clicked.connect(self.play_selected_card)
+        action_layout.addWidget(self.play_button)
+
+        main_layout.addLayout(action_layout)
+
+        self.setLayout(main_layout)
+
+    # Draws background image in
+    def paintEvent(self, event):
+            """
+            Override the paint event to draw the background image. The image
+            is scaled once per window size and only the damaged region is
+            copied from it.
+            """
+            start = time.perf_counter()
+            if self.scaled_background is None or self.scaled_background.size() != self.size():
+                self.scaled_background = self.background_image.scaled(
+                    self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            painter = QPainter(self)
+            area = event.rect()
+            painter.drawPixmap(area, self.scaled_background, area)
+            painter.end()
+            self.paint_stats.record(time.perf_counter() - start)
+            if self.on_first_frame is not None:
+                callback, self.on_first_frame = self.on_first_frame, None
+                callback()
+
+    def resizeEvent(self, event):
+        # Keep a preloaded background that already has the new size
+        if self.scaled_background is not None and self.scaled_background.size() != event.size():
+            self.scaled_background = None
+        super().resizeEvent(event)
+
+    def set_background_image(self, image_path):
+        self.setStyleSheet(f"""
+            QWidget {{
+                background-image: url({image_path});
+                background-position: center;
+                background-repeat: no-repeat;
+                background-size: cover;
+            }}
+        """)
+
+    # Draw a card
+    def on_deck_clicked(self, event):
+        self.draw_card()
+
+    # Draw a super card
+    def on_super_deck_clicked(self, event):
+        self.submit(("super",))
+
+    # Draw a normal card
+    def draw_card(self):
+        self.submit(("draw",))
+
+    # Send a human seat's move to the worker; ignored while a computer seat
+    # is to move or the game is over. The worker drops it if the hand it was
+    # made from is out of date.
+    def submit(self, move):
+        if self.state.computer or self.state.winner != -1:
+            return
+        self.worker.submit(self.shown_seq, move)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.toggle_bots()
+        else:
+            super().keyPressEvent(event)
+
+    # Cancel the computer seat's move in progress and hold the computer
+    # seats, or let them play again
+    def toggle_bots(self):
+        self.bots_paused = not self.bots_paused
+        if self.bots_paused:
+            self.worker.cancel()
+            self.status_label.setText("Computer players paused (Esc to resume)")
+        else:
+            self.status_label.setText(" ")
+            self.worker.resume(self.state.seq)
+
+    # Displays which player's turn it is
+    def update_current_player_label(self):
+        current_player = self.state.current_player + 1
+
+        self.current_player_label.setText(f"    Player {current_player}'s Turn")
+
+        # Set the font: make it larger, and choose a fun font
+        font = QFont("Comic Sans MS", 20, QFont.Bold)  # You can change "Comic Sans MS" to any other font
+        self.current_player_label.setFont(font)
+
+        # Set the color of the text
+        self.current_player_label.setStyleSheet("QLabel { color: #10123a; }")
+
+    def update_player_hand(self):
+        # The current player's hand, or the last human's while a computer seat plays
+        self.hand_view.set_hand(self.state.hand)
+
+    # Discard pile manager
+    def update_discard_pile(self):
+        if self.state.discard_color is not None:  # A wild card's chosen colour
+            pixmap = self.card_images.pixmap(f"card_selected_{self.state.discard_color}", 100, 150)
+        else:
+            # Super cards are named super_<type> like every other <color>_<type>
+            pixmap = self.card_images.card_pixmap(self.state.top_card, 100, 150)
+        self.discard_label.setPixmap(pixmap)
+
+    # Button to play a selected card
+    def play_selected_card(self):
+        if self.state.awaiting_color:
+            self.prompt_color_selection()  # The dialog was closed without a choice
+            return
+
+        card_index = self.hand_view.selected_index()
+        if card_index is None:
+            QMessageBox.warning(self, "No Selection", "Please select a card to play.")
+            return
+
+        self.play_card_at(card_index)
+
+    # Play the current player's card at card_index; with no color, a wild
+    # card's colour is picked in the dialog once the worker asks for it
+    def play_card_at(self, card_index, color=None):
+        self.submit(("play", card_index, color))
+
+    # Color selection when a wild card is played
+    def prompt_color_selection(self):
+        dialog = ColorDialog(self)
+        if dialog.exec() == QDialog.Accepted:
+            self.apply_color(dialog.selected_color)
+
+    def apply_color(self, selected_color):
+        self.submit(("color", selected_color))
+
+    # Redraw from the latest TurnState, once per batch of moves
+    def refresh(self):
+        self.refresh_pending = False
+        state = self.state
+        self.shown_seq = state.seq
+        self.update_discard_pile()
+        if state.winner != -1:
+            QMessageBox.information(self, "Game Over", f"Player {state.winner + 1} wins!")
+            self.play_button.setEnabled(False)
+            #self.draw_button.setEnabled(False)
+            self.close()
+            QApplication.quit()
+            return
+        self.status_label.setText(state.status)
+        self.update_current_player_label()
+        self.update_player_hand()
+        if state.awaiting_color and not state.computer:
+            self.prompt_color_selection()  # Wild/Plus4 card played, choose a new color
+
+    def closeEvent(self, event):
+        self.worker.shutdown()  # Before the log and the bots it uses are closed
+        self.sounds.stop_all()  # The winner's cheer is cut once the game-over box is closed
+        if self.checkpoints is not None:
+            # Closing mid-game keeps the last whole turn (a wild card still
+            # waiting for its colour is not saved)
+            if self.state.winner == -1 and not self.worker.awaiting_color:
+                self.checkpoints.save()
+            self.checkpoints = None
+        if self.game_log is not None:
+            self.game_log.close()
+            self.game_log = None
+        if self.frame_stats:
+            print(self.paint_stats.report())
+            print(self.card_images.report())
+        for bot in self.seat_bots:
+            if bot is not None:
+                bot.close()
+        if self.bot_pool is not None:
+            self.bot_pool.terminate()  # A cancelled search may still be running
+            self.bot_pool.join()
+            self.bot_pool = None
+        super().closeEvent(event)
+
+    def animate_color_selection(self, selected_color):
+        """Animates the selected color card landing on the discard pile."""
+        # Update the discard pile to show the selected color
+        pixmap = self.card_images.pixmap(f"{selected_color}_wild", 100, 150)  # Use wild card of selected color
+
+        # Set the new color image on the discard pile
+        self.discard_label.setPixmap(pixmap)
+
+        # Update the game's active color to the selected color
+        self.apply_color(selected_color)
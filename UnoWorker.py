@@ -0,0 +1,209 @@
+# UnoWorker.py
+# Runs the rules engine and the computer seats off the GUI thread.
+# GameWorker lives on its own QThread and owns the UnoGame; the window only
+# sends it moves and gets back one TurnState per move, an immutable summary
+# of everything the window shows. A computer seat's move is asked for on
+# the worker thread (the window's bots search in a process pool, off this
+# process's GIL), so the window keeps painting, and the move can be
+# cancelled.
+#
+# Moves are the take_turn tuples, ("play", card_index, color), ("draw",)
+# and ("super",), plus ("color", color) to finish a wild card played with
+# color None (a human seat choosing in the dialog).
+import threading
+from collections import namedtuple
+
+from PySide6.QtCore import QObject, QThread, Qt, Signal, Slot
+
+from UnoGame import COLORS, UnoGameObserver
+
+# seq counts completed moves. current_player is the seat to act: while
+# awaiting_color (a human's wild card waiting for ("color", color)) that is
+# the seat that played it, even after a plus4 has moved the engine on to its
+# victim. hand is that seat's cards, except while a bot acts (computer is
+# set): then it is the hand of the human seat that acted last, so a bot's
+# cards are never shown face up. discard_color is the colour to show on
+# the pile after a wild card (None: show top_card). cues are the sound
+# effects of the move.
+TurnState = namedtuple("TurnState", (
+    "seq", "current_player", "hand", "hand_sizes", "top_card", "discard_color",
+    "winner", "status", "cues", "awaiting_color", "computer"))
+
+# hand_seat is whose cards go in hand (default: seat)
+def turn_state(game, seq=0, status="", cues=(), discard_color=None, awaiting_color=False,
+               computer=False, seat=None, hand_seat=None):
+    if seat is None:
+        seat = game.current_player
+    if hand_seat is None:
+        hand_seat = seat
+    return TurnState(seq, seat, tuple(game.players[hand_seat]),
+                     tuple(game.hand_sizes.sizes), game.top_card, discard_color,
+                     game.check_winner(), status, tuple(cues), awaiting_color, computer)
+
+# Collects what the window needs to show about one move from the engine's
+# notifications
+class MoveCues(UnoGameObserver):
+    def __init__(self):
+        self.sounds = []
+        self.discard_color = None
+
+    def on_card_played(self, player_index, card_index, card):
+        self.sounds.append("PlayCard.wav")
+        self.discard_color = None
+
+    def on_card_drawn(self, player_index, card):
+        self.sounds.append("DrawCard.wav")
+
+    def on_super_card_drawn(self, player_index, card):
+        self.sounds.append("DrawCard.wav")
+
+    def on_winner(self, player_index):
+        self.sounds.append("Winner.wav")
+
+    def on_color_displayed(self, color):
+        self.discard_color = color
+
+# bots has a bot (UnoBots signature) or None per seat. stop is the
+# threading.Event the bots' searches watch (MCTSBot(stop=...)); cancel()
+# sets it from the GUI thread. Call start() once the window has connected
+# its slots, and shutdown() before the game and bots are closed.
+class GameWorker(QObject):
+    state_changed = Signal(object)  # TurnState after each move
+    rejected = Signal(str, str)  # title, message for a move the engine refused
+    cancelled = Signal(int)  # Seat whose computer move was cancelled
+    move_requested = Signal(int, object)  # seq the move was made at, move
+    think_requested = Signal(int)  # seq the bot should move at
+
+    def __init__(self, game, bots, stop=None):
+        super().__init__()
+        self.game = game
+        self.bots = bots
+        self.stop = stop if stop is not None else threading.Event()
+        self.cues = MoveCues()
+        game.add_observer(self.cues)
+        self.seq = 0
+        self.awaiting_color = False
+        self.chooser = None  # Seat whose wild card awaits its colour
+        # Human seat whose hand is shown while bots act: the last to act, or
+        # the first to come (None if every seat is a bot)
+        order = [(game.current_player + i * game.direction) % game.num_players
+                 for i in range(game.num_players)]
+        self.viewer = next((seat for seat in order if bots[seat] is None), None)
+        self.thread = None
+        self.move_requested.connect(self.submit_move)
+        # Queued even when the worker asks itself, so the thread's event loop
+        # runs between bot moves
+        self.think_requested.connect(self.think, Qt.QueuedConnection)
+
+    # The seat whose move comes next: the current player, or the chooser
+    def acting_seat(self):
+        return self.chooser if self.awaiting_color else self.game.current_player
+
+    def state(self, status=""):
+        seat = self.acting_seat()
+        computer = self.bots[seat] is not None
+        if not computer:
+            self.viewer = seat
+        return turn_state(self.game, self.seq, status, self.cues.sounds, self.cues.discard_color,
+                          self.awaiting_color, computer, seat,
+                          self.viewer if computer else seat)
+
+    def start(self):
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self.thread.start()
+        self.think_requested.emit(self.seq)
+
+    def shutdown(self):
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.quit()
+            self.thread.wait()
+            self.thread = None
+
+    # GUI thread: a human seat's move, made against the TurnState with seq
+    def submit(self, seq, move):
+        self.move_requested.emit(seq, move)
+
+    # GUI thread: cancel the computer move being thought about (and hold
+    # further ones) until resume()
+    def cancel(self):
+        self.stop.set()
+
+    def resume(self, seq):
+        self.stop.clear()
+        self.think_requested.emit(seq)
+
+    # Dropped if a move has been applied since the window's state, e.g. a
+    # click that reached the worker after the turn passed to the next seat
+    @Slot(int, object)
+    def submit_move(self, seq, move):
+        if seq == self.seq and self.bots[self.acting_seat()] is None:
+            self.apply(move)
+
+    @Slot(int)
+    def think(self, seq):
+        game = self.game
+        seat = game.current_player
+        bot = self.bots[seat]
+        if seq != self.seq or bot is None or self.awaiting_color or game.check_winner() != -1:
+            return
+        if not self.stop.is_set():
+            move = bot(game, seat)
+            if not self.stop.is_set():
+                self.apply(move)
+                return
+        self.cancelled.emit(seat)
+
+    def apply(self, move):
+        game = self.game
+        if game.check_winner() != -1:
+            return
+        seat = game.current_player
+        if move[0] == "color":
+            if self.awaiting_color and move[1] in COLORS[:4]:
+                self.awaiting_color = False
+                self.choose_color(move[1])
+                self.finish_turn("")
+            return
+        if self.awaiting_color:
+            return  # The wild card's colour comes first
+
+        if move[0] == "play":
+            success, message = game.play_card(seat, move[1])
+            if not success:
+                self.rejected.emit("Invalid Move", message)
+                return
+            if message == "Color selection needed.":
+                if move[2] is None:
+                    self.awaiting_color = True
+                    self.chooser = seat
+                    self.publish(message)
+                    return
+                self.choose_color(move[2])
+        elif move[0] == "super":
+            success, message = game.draw_super_card(seat)
+            if not success:
+                self.rejected.emit("Super Deck Empty", message)
+                return
+        else:
+            success, message = game.draw_card(seat)
+            if not success:
+                self.rejected.emit("Draw Failed", message)
+                return
+        self.finish_turn(message)
+
+    def choose_color(self, color):
+        self.game.choose_new_color(color)
+        self.game.select_color(color)  # Shown via on_color_displayed
+
+    def finish_turn(self, status):
+        self.game.end_turn()
+        self.seq += 1
+        self.publish(status)
+        if self.bots[self.game.current_player] is not None and self.game.check_winner() == -1:
+            self.think_requested.emit(self.seq)
+
+    def publish(self, status):
+        self.state_changed.emit(self.state(status))
+        self.cues.sounds = []
@@ -0,0 +1,28 @@
+# benchmarks/bench_clone.py
+# Cost of copying game state for search bots: UnoGame.clone, snapshot and
+# restore against copy.deepcopy, in microseconds per call.
+# Run from the repository root: python benchmarks/bench_clone.py
+import copy
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from UnoBots import RandomBot
+from bench_common import midgame, per_call_us
+
+def main():
+    for num_players in (2, 4, 10):
+        game = midgame(num_players, 30, policy=RandomBot(random.Random(0)))
+        snap = game.snapshot()
+        rng = random.Random(1)
+        print(f"{num_players} players, {sum(map(len, game.players))} cards in hands")
+        print(f"  clone()             {per_call_us(game.clone, 2000):8.2f} us")
+        print(f"  clone(rng=rng)      {per_call_us(lambda: game.clone(rng), 2000):8.2f} us")
+        print(f"  snapshot()          {per_call_us(game.snapshot, 2000):8.2f} us")
+        print(f"  restore(snapshot)   {per_call_us(lambda: game.restore(snap), 2000):8.2f} us")
+        print(f"  copy.deepcopy       {per_call_us(lambda: copy.deepcopy(game), 50):8.2f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+# benchmarks/bench_common.py
+# Helpers shared by the benchmark scripts. Import after the script has put
+# the repository root on sys.path.
+import random
+import timeit
+
+from UnoGame import UnoGame
+from UnoBots import simple_policy
+
+# Best of `repeat` timings of `number` calls, in microseconds per call
+def per_call_us(func, number, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+# A game some turns in, so hands and the discard pile are not trivial.
+# policy(game, seat) picks the moves (default simple_policy).
+def midgame(num_players=4, turns=20, seed=0, policy=simple_policy):
+    game = UnoGame(num_players, rng=random.Random(seed))
+    for _ in range(turns):
+        game.take_turn(policy(game, game.current_player))
+        if game.check_winner() != -1:
+            break
+    return game
@@ -0,0 +1,206 @@
+# benchmarks/bench_suite.py
+# Benchmarks for the engine hot paths and the window's refresh, with fixed
+# seeds. Results are written as JSON and compared against a stored
+# baseline; any result more than --tolerance worse is flagged and the exit
+# status is 1.
+#   python benchmarks/bench_suite.py                      run and compare
+#   python benchmarks/bench_suite.py --save-baseline      store this run
+#   python benchmarks/bench_suite.py --no-gui --output r.json
+# The GUI section needs PySide6 and runs offscreen; run it from the
+# repository root (or pass --assets) so the card images load.
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from UnoGame import UnoGame, DECK_CARDS, SUPER_TYPES
+from UnoBots import simple_policy, play_game
+from bench_common import midgame, per_call_us
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Snapshot of a game where the current player holds a card of card_type at
+# position 0 and may play it
+def position_with(card_type, seed=0):
+    game = midgame(seed=seed)
+    seat = game.current_player
+    hand = game.players[seat]
+    if card_type in SUPER_TYPES:
+        card = next(c for c in game.super_deck if c.type == card_type)
+        game.super_deck.remove(card)
+    else:
+        card = next(c for c in game.deck if c.type == card_type)
+        cards = list(game.deck)
+        cards.remove(card)
+        game.deck.replace(cards)
+    hand.insert(0, card)
+    if card.color_bit < 16:  # Coloured card: match the colour in play
+        game.active_color = card.color_bit
+    return game, game.snapshot(), seat
+
+# Median cost of `op` on a freshly restored game. Each call is timed on its
+# own so the restore is left out, and the timer's own overhead is taken off.
+def op_us(game, snapshot, op, number=2000):
+    clock = time.perf_counter_ns
+    overhead = sorted(-clock() + clock() for _ in range(1000))[500]
+    samples = []
+    for _ in range(number):
+        game.restore(snapshot)
+        start = clock()
+        op()
+        samples.append(clock() - start)
+    samples.sort()
+    return max(0, samples[len(samples) // 2] - overhead) / 1000
+
+def bench_engine(results, quick):
+    number = 500 if quick else 2000
+
+    # is_playable over a fixed sample of (card, top card, colour) triples
+    rng = random.Random(0)
+    triples = [(rng.choice(DECK_CARDS), rng.choice(DECK_CARDS), 1 << rng.randrange(4))
+               for _ in range(1000)]
+
+    def check_all():
+        for card, top, color in triples:
+            card.is_playable(top, False, color)
+
+    results["is_playable"] = (per_call_us(check_all, number // 100 or 1) / len(triples), "us")
+
+    for card_type in ("five", "skip", "reverse", "plus2", "wild", "plus4") + SUPER_TYPES:
+        game, snapshot, seat = position_with(card_type)
+        results[f"play_card.{card_type}"] = (op_us(game, snapshot, lambda: game.play_card(seat, 0), number), "us")
+
+    game = midgame()
+    snapshot = game.snapshot()
+    for n in (1, 2, 4, 8):
+        results[f"draw_cards.{n}"] = (op_us(game, snapshot, lambda: game.draw_cards(0, n), number), "us")
+
+    # replenish_deck with most of the cards on the discard pile
+    game = midgame()
+    game.discard.extend(game.deck)
+    game.deck.replace([])
+    snapshot = game.snapshot()
+    results["replenish_deck"] = (op_us(game, snapshot, game.replenish_deck, number // 4), "us")
+
+    for num_players in (2, 4, 10):
+        games = 100 if quick else 400
+        start = time.perf_counter()
+        for i in range(games):
+            game = UnoGame(num_players, rng=random.Random(f"bench/{num_players}/{i}"))
+            play_game(game, [simple_policy] * num_players)
+        results[f"games_per_sec.{num_players}p"] = (games / (time.perf_counter() - start), "games/s")
+
+def bench_gui(results, quick):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from UnoWindow import UnoGameWindow
+    from UnoWorker import turn_state
+
+    app = QApplication.instance() or QApplication([])
+    window = UnoGameWindow(sound=False)
+    window.show()
+    app.processEvents()
+    # The window draws from TurnStates; feed it ones built from a local game
+    game = UnoGame(4, rng=random.Random(0))
+    number = 50 if quick else 200
+
+    hand = game.players[game.current_player]
+    for size in (7, 15, 30, 60):
+        if len(hand) < size:
+            game.draw_cards(game.current_player, size - len(hand))
+        while len(hand) > size:
+            hand.pop()
+        window.state = turn_state(game)
+
+        def update():
+            window.update_player_hand()
+
+        def update_and_paint():
+            window.update_player_hand()
+            window.hand_view.repaint()
+
+        results[f"update_player_hand.{size}"] = (per_call_us(update, number), "us")
+        results[f"update_player_hand+paint.{size}"] = (per_call_us(update_and_paint, number), "us")
+
+    results["update_discard_pile"] = (per_call_us(window.update_discard_pile, number), "us")
+    window.close()
+
+def higher_is_better(unit):
+    return unit.endswith("/s")
+
+# Results more than `tolerance` worse than the baseline
+def regressions(results, baseline, tolerance):
+    flagged = []
+    for name, entry in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = entry["value"] / base["value"] - 1
+        worse = -change if higher_is_better(entry["unit"]) else change
+        if worse > tolerance:
+            flagged.append((name, base["value"], entry["value"], entry["unit"], worse))
+    return flagged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine and GUI benchmarks with baseline comparison.")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--no-gui", action="store_true")
+    parser.add_argument("--assets", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="directory holding assets/ for the GUI section")
+    args = parser.parse_args(argv)
+
+    raw = {}
+    bench_engine(raw, args.quick)
+    if not args.no_gui:
+        try:
+            os.chdir(args.assets)
+            bench_gui(raw, args.quick)
+        except ImportError as e:
+            print(f"skipping GUI benchmarks: {e}")
+
+    results = {name: {"value": round(value, 4), "unit": unit} for name, (value, unit) in raw.items()}
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "quick": args.quick, "results": results}
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored["quick"] == args.quick:
+            baseline = stored["results"]
+        else:
+            print("baseline was run with a different --quick setting; not comparing")
+
+    print(f"{'benchmark':<34}{'result':>14}{'baseline':>14}{'change':>9}")
+    for name, entry in results.items():
+        line = f"{name:<34}{entry['value']:>11.3f} {entry['unit']:<2}"
+        base = baseline.get(name)
+        if base:
+            line += f"{base['value']:>11.3f}   {entry['value'] / base['value'] - 1:>+8.1%}"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    flagged = regressions(results, baseline, args.tolerance)
+    for name, before, after, unit, worse in flagged:
+        print(f"REGRESSION {name}: {before:.3f} -> {after:.3f} {unit} ({worse:.0%} worse)")
+    return 1 if flagged else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,53 @@
- # main.py
+# main.py
+import time
+START_TIME = time.perf_counter()  # Before anything else, for --profile-startup
+import sys, os, importlib
 from PySide6.QtWidgets import (
-    QApplication, QLabel, QVBoxLayout, QWidget, QPushButton, QDialog,
-    QHBoxLayout, QMessageBox, QGridLayout, QListWidget, QListWidgetItem
+    QApplication, QLabel, QVBoxLayout, QWidget, QPushButton
 )
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
-from PySide6.QtGui import QPixmap, QIcon, QPainter, QFont
-from PySide6.QtCore import Qt, QUrl, QThread
-import sys, os
-from UnoGame import UnoGame
+from PySide6.QtCore import Qt, QTimer
+
+# Only QtWidgets is loaded before the menu shows. The rules engine (for its
+# card table, which names the card images) and the assets module are
+# imported when the preload starts, QtMultimedia when it is done (to load
+# the sound effects while the menu is up), and the bots and the game window
+# (UnoWindow) when Play is pressed.
+
+FRAME_STATS = False  # Print paint timings when the game window closes (--frame-stats)
+SOUND_ENABLED = True  # --no-sound creates no audio objects at all
+PROFILE_STARTUP = False  # Print the cold-start breakdown at the game's first paint (--profile-startup)
+GAME_LOG_PATH = None  # Record games to this UnoLog file (--record PATH)
+SAVE_PATH = None  # Resume from and checkpoint to this UnoSave file (--save PATH)
+CHECKPOINT_EVERY = 1  # Turns between checkpoints (--checkpoint-every N)
+PROFILE = False  # Time engine, asset, audio and widget calls; summary at game end (--profile)
+PROFILE_OUTPUT = None  # Also write the profile as JSON here (--profile-output PATH)
+STARTUP_MARKS = [("QtWidgets imported", time.perf_counter() - START_TIME)]  # (milestone, seconds since START_TIME)
+
+def mark_startup(name):
+    STARTUP_MARKS.append((name, time.perf_counter() - START_TIME))
+
+# Import a module, recording how long it took (nothing if already loaded)
+def timed_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    STARTUP_MARKS.append((f"import {name} ({(time.perf_counter() - start) * 1000:.1f} ms)",
+                          time.perf_counter() - START_TIME))
+    return module
+
+def startup_report():
+    lines = ["startup (ms since launch, +ms since previous step):"]
+    previous = 0.0
+    for name, seconds in STARTUP_MARKS:
+        lines.append(f"  {seconds * 1000:8.1f}  +{(seconds - previous) * 1000:7.1f}  {name}")
+        previous = seconds
+    return "\n".join(lines)
+
+# Wrap the profiled methods of whatever has been imported so far
+def instrument():
+    if PROFILE:
+        importlib.import_module("UnoProfile").instrument()
 
 class StartMenu(QWidget):
     def __init__(self):
@@ -23,11 +63,21 @@ class StartMenu(QWidget):
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
+        # Asset loading progress
+        self.loading_label = QLabel("Loading cards...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.loading_label)
+
         # Play button
         play_button = QPushButton("Play")
-        play_button.clicked.connect(self.start_game)
+        play_button.clicked.connect(lambda: self.start_game())
         layout.addWidget(play_button)
 
+        # Play against three computer players
+        computer_button = QPushButton("Play vs Computer")
+        computer_button.clicked.connect(lambda: self.start_game(["human", "computer", "computer", "computer"]))
+        layout.addWidget(computer_button)
+
         # Info button
         info_button = QPushButton("Info")
         info_button.clicked.connect(self.show_info)
@@ -40,11 +90,86 @@ class StartMenu(QWidget):
 
         self.setLayout(layout)
 
-    def start_game(self):
+        # Card images, sounds and the background are loaded on a worker
+        # thread once the menu has painted; Play waits for them
+        self.card_images = None
+        self.preloader = None
+        self.preloaded = None
+        self.sounds = None  # SoundEngine built once the preload is done
+        self.pending_seat_types = None
+        self.waiting_to_start = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.preloader is None:
+            mark_startup("menu first paint")
+            self.preloader = False  # Started from the event loop, after this frame
+            QTimer.singleShot(0, self.start_preload)
+
+    def start_preload(self):
+        timed_import("UnoGame")  # Imported by UnoAssets; timed on its own line
+        timed_import("UnoAssets")
+        timed_import("UnoAudio")
+        instrument()
+        from UnoAssets import AssetPreloader, HAND_CARD_SIZE, PILE_CARD_SIZE, BACKGROUND_PATH, WINDOW_SIZE
+        from UnoAudio import SOUND_DIR, SOUND_EFFECTS
+        sounds = [os.path.join(SOUND_DIR, name) for name in SOUND_EFFECTS + ("backgroundMusic.wav",)]
+        self.preloader = AssetPreloader((HAND_CARD_SIZE, PILE_CARD_SIZE), BACKGROUND_PATH, WINDOW_SIZE,
+                                        sounds if SOUND_ENABLED else (), parent=self)
+        self.preloader.progress.connect(self.on_preload_progress)
+        self.preloader.ready.connect(self.on_preload_ready)
+        self.preloader.start()
+        mark_startup("preload started")
+
+    def on_preload_progress(self, done, total):
+        if not self.waiting_to_start:
+            self.loading_label.setText(f"Loading cards... {done * 100 // total}%")
+
+    def on_preload_ready(self, assets):
+        from UnoAssets import CardImageCache
+        self.card_images = CardImageCache()
+        self.card_images.add_images(assets["cards"])
+        self.preloaded = assets
+        self.preloader.wait()
+        mark_startup("assets ready")
+        if SOUND_ENABLED:
+            # QSoundEffect loads on the GUI thread; start it now so the
+            # game's first sound does not wait for it
+            timed_import("PySide6.QtMultimedia")
+            from UnoAudio import SoundEngine
+            self.sounds = SoundEngine()
+            mark_startup("sound effects created")
+        self.loading_label.setText(f"Ready (loaded in {assets['seconds'] * 1000:.0f} ms)")
+        if self.waiting_to_start:
+            self.start_game(self.pending_seat_types)
+
+    def start_game(self, seat_types=None):
+        if self.preloaded is None:
+            # Start as soon as the preload finishes
+            self.waiting_to_start = True
+            self.pending_seat_types = seat_types
+            self.loading_label.setText("Starting once the cards are loaded...")
+            return
+        self.waiting_to_start = False
         self.hide()  # Hide menu when game starts
-        self.game_window = UnoGameWindow()
+        # The game's modules are only loaded now
+        for module in ("UnoMCTS", "UnoWindow"):
+            timed_import(module)
+        instrument()
+        from UnoWindow import UnoGameWindow
+        self.game_window = UnoGameWindow(seat_types=seat_types, card_images=self.card_images,
+                                         background=self.preloaded, sound=SOUND_ENABLED, sounds=self.sounds,
+                                         frame_stats=FRAME_STATS, on_first_frame=self.on_game_painted,
+                                         log_path=GAME_LOG_PATH, save_path=SAVE_PATH,
+                                         checkpoint_every=CHECKPOINT_EVERY)
+        mark_startup("game window built")
         self.game_window.show()
 
+    def on_game_painted(self):
+        mark_startup("game first paint")
+        if PROFILE_STARTUP:
+            print(startup_report())
+
     def show_info(self):
         self.info_window = InfoWindow()
         self.info_window.show()
@@ -52,6 +177,14 @@ class StartMenu(QWidget):
     def close_game(self):
         QApplication.instance().quit()
 
+    # --profile: summary when the application quits (the game's end)
+    def dump_profile(self):
+        import UnoProfile
+        if self.card_images is not None:
+            for name in ("hits", "misses", "evictions", "decodes"):
+                UnoProfile.count(f"card cache {name}", getattr(self.card_images, name))
+        UnoProfile.dump(PROFILE_OUTPUT)
+
 class InfoWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -66,302 +199,31 @@ class InfoWindow(QWidget):
 
         self.setLayout(layout)
 
-class ColorDialog(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Choose a Color")
-        self.selected_color = None
-
-        layout = QVBoxLayout()
-        button_layout = QHBoxLayout()
-
-        # Buttons for each color
-        colors = ['red', 'blue', 'green', 'yellow']
-        for color in colors:
-            button = QPushButton(color.capitalize())
-            button.setStyleSheet(f'background-color: {color}')
-            button.clicked.connect(lambda _, c=color: self.set_color(c))
-            button_layout.addWidget(button)
-
-        layout.addLayout(button_layout)
-
-        self.setLayout(layout)
-
-    def set_color(self, color):
-        self.selected_color = color
-        self.accept()
-
-class UnoGameWindow(QWidget):
-    def __init__(self, num_players=4):
-        super().__init__()
-        self.uno_game = UnoGame(num_players)
-        self.num_players = num_players
-
-        # Set up background and music
-        self.background_image = QPixmap("assets/backgrounds/Background12.png")
-
-        self.background_music_player = QMediaPlayer()
-        self.background_audio_output = QAudioOutput()
-        self.background_music_player.setAudioOutput(self.background_audio_output)
-        self.background_audio_output.setVolume(0.05)
-        self.setup_background_music()
-
-        self.sfx_player = QMediaPlayer()
-        self.sfx_audio_output = QAudioOutput()
-        self.sfx_player.setAudioOutput(self.sfx_audio_output)
-
-        self.init_ui()
-
-    def setup_background_music(self):
-        music_file_path = os.path.join(os.getcwd(), "sounds", "backgroundMusic.wav")
-        self.background_music_player.setSource(QUrl.fromLocalFile(music_file_path))
-        self.background_music_player.setLoops(QMediaPlayer.Loops.Infinite)
-        self.background_music_player.play()
-
-    def play_sound_effect(self, sound_file):
-        file_path = os.path.join(os.getcwd(), "sounds", sound_file)
-        self.sfx_player.setSource(QUrl.fromLocalFile(file_path))
-        self.sfx_player.play()
-
-    def init_ui(self):
-        self.setWindowTitle("Uno Game")
-        self.setGeometry(100, 100, 1000, 600)  # Width x Height
-
-        # Main layout
-        main_layout = QVBoxLayout()
-
-        # Top layout: Deck and Discard Pile
-        top_layout = QHBoxLayout()
-
-        # Deck
-        self.deck_label = QLabel(self)
-        deck_pixmap = QPixmap('assets/cards/back.png').scaled(100, 150, Qt.KeepAspectRatio)
-        self.deck_label.setPixmap(deck_pixmap)
-        self.deck_label.setAlignment(Qt.AlignCenter)
-        self.deck_label.setCursor(Qt.PointingHandCursor)  # Change cursor to pointer
-        self.deck_label.mousePressEvent = self.on_deck_clicked  # Connect click event
-        top_layout.addWidget(self.deck_label)
-
-        self.super_deck_label = QLabel(self)
-        super_deck_pixmap = QPixmap('assets/cards/super_card_back.png').scaled(100, 150, Qt.KeepAspectRatio)
-        self.super_deck_label.setPixmap(super_deck_pixmap)
-        self.super_deck_label.setAlignment(Qt.AlignCenter)
-        self.super_deck_label.setCursor(Qt.PointingHandCursor)  # Change cursor to pointer
-        self.super_deck_label.mousePressEvent = self.on_super_deck_clicked  # Connect click event
-        top_layout.addWidget(self.super_deck_label)
-
-        # Discard Pile
-        self.discard_label = QLabel(self)
-        top_card = self.uno_game.top_card
-        discard_image_path = f'assets/cards/{top_card.color}_{top_card.type}.png'
-        discard_pixmap = QPixmap(discard_image_path).scaled(100, 150, Qt.KeepAspectRatio)
-        self.discard_label.setPixmap(discard_pixmap)
-        self.discard_label.setAlignment(Qt.AlignCenter)
-        top_layout.addWidget(self.discard_label)
-
-        main_layout.addLayout(top_layout)
-
-        # Middle layout: Current Player and Instructions
-        middle_layout = QHBoxLayout()
-
-        # Current Player Info
-        self.current_player_label = QLabel(self)
-        self.update_current_player_label()
-        middle_layout.addWidget(self.current_player_label)
-
-        # Game Status
-        self.status_label = QLabel(" ") #Game Started!
-        middle_layout.addWidget(self.status_label)
-
-        main_layout.addLayout(middle_layout)
-
-        # Player's Hand
-        self.hand_layout = QHBoxLayout()
-        self.update_player_hand()
-        main_layout.addLayout(self.hand_layout)
-
-        # Action Buttons
-        action_layout = QHBoxLayout()
-
-        # Play Selected Card
-        self.play_button = QPushButton('Play Selected Card', self)
-        self.play_button.clicked.connect(self.play_selected_card)
-        action_layout.addWidget(self.play_button)
-
-        main_layout.addLayout(action_layout)
-
-        self.setLayout(main_layout)
-
-    # Draws background image in
-    def paintEvent(self, event):
-            """
-            Override the paint event to draw the background image.
-            """
-            painter = QPainter(self)
-
-            painter.drawPixmap(self.rect(), self.background_image)
-
-    def set_background_image(self, image_path):
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-image: url({image_path});
-                background-position: center;
-                background-repeat: no-repeat;
-                background-size: cover;
-            }}
-        """)
-
-    # Draw a card
-    def on_deck_clicked(self, event):
-        self.draw_card()
-
-    # Draw a super card
-    def on_super_deck_clicked(self, event):
-        if self.uno_game.super_deck:
-            super_card = self.uno_game.super_deck.pop()  # Draw from the super deck
-            self.uno_game.players[self.uno_game.current_player].append(super_card)
-            self.play_sound_effect("DrawCard.wav")
-            #self.status_label.setText("Super card drawn!")
-            self.update_player_hand()  # Update hand to show the new super card
-            self.uno_game.current_player = (self.uno_game.current_player + self.uno_game.direction) % self.num_players
-            self.update_current_player_label()  # Update the label to show the next player's turn
-            self.update_player_hand()  # Update the hand to show the next player's cards
-        else:
-            QMessageBox.warning(self, "Super Deck Empty", "No super cards left to draw.")
-
-    # Draw a normal card
-    def draw_card(self):
-        self.play_sound_effect("DrawCard.wav")
-        success, message = self.uno_game.draw_card(self.uno_game.current_player)
-        if success:
-            self.status_label.setText(message)
-            self.update_player_hand()  # Update the current player's hand after drawing
-            # Switch to the next player
-            self.uno_game.current_player = (self.uno_game.current_player + self.uno_game.direction) % self.num_players
-            self.update_current_player_label()  # Update the label to show the next player's turn
-            self.update_player_hand()  # Update the hand to show the next player's cards
-        else:
-            QMessageBox.warning(self, "Draw Failed", message)
-
-    # Displays which player's turn it is
-    def update_current_player_label(self):
-        current_player = self.uno_game.current_player + 1
-
-        self.current_player_label.setText(f"    Player {current_player}'s Turn")
-
-        # Set the font: make it larger, and choose a fun font
-        font = QFont("Comic Sans MS", 20, QFont.Bold)  # You can change "Comic Sans MS" to any other font
-        self.current_player_label.setFont(font)
-
-        # Set the color of the text
-        self.current_player_label.setStyleSheet("QLabel { color: #10123a; }")
-
-    def update_player_hand(self):
-        for i in reversed(range(self.hand_layout.count())):
-            widget = self.hand_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-
-        # Get current player's hand
-        current_player = self.uno_game.current_player
-        player_hand = self.uno_game.players[current_player]
-
-        self.card_buttons = []
-        for idx, card in enumerate(player_hand):
-            button = QPushButton(self)
-            card_image_path = f'assets/cards/{card.color}_{card.type}.png'
-            pixmap = QPixmap(card_image_path).scaled(80, 120, Qt.KeepAspectRatio)
-            icon = QIcon(pixmap)
-            button.setIcon(icon)
-            button.setIconSize(pixmap.size())
-            button.setCheckable(True)
-            button.setFixedSize(90, 130)
-            button.card_index = idx
-            self.hand_layout.addWidget(button)
-            self.card_buttons.append(button)
-
-    # Discard pile manager
-    def update_discard_pile(self):
-        top_card = self.uno_game.top_card
-        if top_card.type == "chiefskip" or top_card.type == "doubleplay" or top_card.type == "extplayall" or top_card.type == "intplayall":
-            discard_image_path = f'assets/cards/super_{top_card.type}.png'  # Super card image
-        else:
-            discard_image_path = f'assets/cards/{top_card.color}_{top_card.type}.png'
-        pixmap = QPixmap(discard_image_path).scaled(100, 150, Qt.KeepAspectRatio)
-        self.discard_label.setPixmap(pixmap)
-
-    # Button to play a selected card
-    def play_selected_card(self):
-
-        selected_buttons = [btn for btn in self.card_buttons if btn.isChecked()]
-        if not selected_buttons:
-            QMessageBox.warning(self, "No Selection", "Please select a card to play.")
-            return
-        if len(selected_buttons) > 1:
-            QMessageBox.warning(self, "Multiple Selections", "Please select only one card to play.")
-            return
-
-        selected_button = selected_buttons[0]
-        card_index = selected_button.card_index
-        success, message = self.uno_game.play_card(self.uno_game.current_player, card_index)
-
-        if success:
-            self.status_label.setText(message)
-            if "Color selection needed" in message:
-                self.prompt_color_selection()  # Wild/Plus4 card played, choose a new color
-            else:
-                self.update_discard_pile()
-                self.next_turn()
-
-        else:
-            QMessageBox.warning(self, "Invalid Move", message)
-
-        self.play_sound_effect("PlayCard.wav")
-
-
-    # Color selection when a wild card is played
-    def prompt_color_selection(self):
-        dialog = ColorDialog(self)
-        if dialog.exec() == QDialog.Accepted:
-            selected_color = dialog.selected_color
-            self.uno_game.choose_new_color(selected_color)  # Set new color in game logic
-            special_image_path = f'assets/cards/card_selected_{selected_color}.png'
-            pixmap = QPixmap(special_image_path).scaled(100, 150, Qt.KeepAspectRatio)
-            self.discard_label.setPixmap(pixmap)
-
-            self.next_turn()
-
-    def next_turn(self):
-        # Proceed to the next player's turn
-        self.uno_game.current_player = (self.uno_game.current_player + self.uno_game.direction) % self.num_players
-        winner = self.uno_game.check_winner()
-        if winner != -1:
-            QMessageBox.information(self, "Game Over", f"Player {winner + 1} wins!")
-            self.play_button.setEnabled(False)
-            #self.draw_button.setEnabled(False)
-            QApplication.quit()
-        else:
-            self.update_current_player_label()
-            self.update_player_hand()
-
-    def animate_color_selection(self, selected_color):
-        """Animates the selected color card landing on the discard pile."""
-        # Update the discard pile to show the selected color
-        discard_image_path = f'assets/cards/{selected_color}_wild.png'  # Use wild card of selected color
-        pixmap = QPixmap(discard_image_path).scaled(100, 150, Qt.KeepAspectRatio)
-
-        # Set the new color image on the discard pile
-        self.discard_label.setPixmap(pixmap)
-
-        # Update the game's top card color to the selected color
-        self.uno_game.top_card.color = selected_color
-
-    def on_color_selected(self, color):
-        self.uno_game.select_color(color)
 
 if __name__ == '__main__':
+    FRAME_STATS = "--frame-stats" in sys.argv
+    SOUND_ENABLED = "--no-sound" not in sys.argv
+    PROFILE_STARTUP = "--profile-startup" in sys.argv
+    if "--record" in sys.argv[:-1]:
+        GAME_LOG_PATH = sys.argv[sys.argv.index("--record") + 1]
+    if "--save" in sys.argv[:-1]:
+        SAVE_PATH = sys.argv[sys.argv.index("--save") + 1]
+    if "--checkpoint-every" in sys.argv[:-1]:
+        CHECKPOINT_EVERY = int(sys.argv[sys.argv.index("--checkpoint-every") + 1])
+        if CHECKPOINT_EVERY < 1:
+            sys.exit("--checkpoint-every must be at least 1")
+    if "--profile-output" in sys.argv[:-1]:
+        PROFILE_OUTPUT = sys.argv[sys.argv.index("--profile-output") + 1]
+    PROFILE = "--profile" in sys.argv or PROFILE_OUTPUT is not None
+    if PROFILE:
+        import UnoProfile
+        UnoProfile.enable()
     app = QApplication(sys.argv)
+    mark_startup("QApplication created")
     menu = StartMenu()
+    mark_startup("menu built")
+    if PROFILE:
+        app.aboutToQuit.connect(menu.dump_profile)
     menu.show()
     #window = UnoGameWindow(num_players=4)
     #window.show()
@@ -0,0 +1,705 @@
+# tests/reference_engine.py
+# UnoGame.py as it was before the rules moved into per-card tables (RULES,
+# CARD_ACTIONS, SUPER_EFFECTS and the modifier phases). Frozen: the
+# equivalence test plays the same moves through this and UnoGame and
+# expects identical results. Do not edit to follow rule changes; a
+# deliberate rule change updates or retires the test instead.
+import copy
+import heapq
+import random
+from operator import attrgetter
+
+# Card colours and types. Each card packs them into one small integer:
+# a colour bit (so playability is a mask test) and a type id.
+COLORS = ("red", "blue", "yellow", "green", "all", "super")
+NORMAL_TYPES = ("zero", "one", "two", "three", "four", "five", "six", "seven",
+                "eight", "nine", "skip", "reverse", "plus2")
+WILD_TYPES = ("plus4", "wild")
+SUPER_TYPES = ("extplayall", "intplayall", "doubleplay", "chiefskip")
+TYPES = NORMAL_TYPES + WILD_TYPES + SUPER_TYPES
+
+COLOR_BITS = {color: 1 << i for i, color in enumerate(COLORS)}
+TYPE_IDS = {card_type: i for i, card_type in enumerate(TYPES)}
+TYPE_BITS = 5  # len(TYPES) fits in 5 bits
+ANY_COLOR = COLOR_BITS["all"] | COLOR_BITS["super"]  # Playable on anything
+
+class Card:
+    # Immutable flyweight: every game shares the same 120 Card objects in CARDS
+    __slots__ = ("id", "color", "type", "color_bit", "type_id", "code")
+
+    def __init__(self, card_id, color, card_type):
+        set_field = object.__setattr__
+        set_field(self, "id", card_id)  # Index into CARDS
+        set_field(self, "color", color)
+        set_field(self, "type", card_type)
+        set_field(self, "color_bit", COLOR_BITS[color])
+        set_field(self, "type_id", TYPE_IDS[card_type])
+        set_field(self, "code", (COLOR_BITS[color] << TYPE_BITS) | TYPE_IDS[card_type])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable; the chosen colour lives in UnoGame.active_color")
+
+    # Copies and pickles resolve to the shared table entry
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (card_by_id, (self.id,))
+
+    def __str__(self):
+        return f"{self.color} {self.type}"
+
+    def __repr__(self):
+        return f"Card({self.id}, {self.color!r}, {self.type!r})"
+
+    # active_color is the colour bit in play (UnoGame.active_color); it
+    # defaults to the top card's own colour
+    def is_playable(self, top_card, allPlay, active_color=None):
+        if active_color is None:
+            active_color = top_card.color_bit
+        return (
+            allPlay or
+            self.color_bit & (active_color | ANY_COLOR) != 0 or
+            self.type_id == top_card.type_id
+        )
+
+# The shared card table: 108 normal cards followed by 12 super cards
+def _build_card_table():
+    specs = []
+    for color in ["red", "blue", "yellow", "green"]:
+        for card_type in NORMAL_TYPES:
+            specs.append((color, card_type))
+            if card_type != "zero":  # Add a second set of non-zero cards
+                specs.append((color, card_type))
+    for _ in range(4):
+        specs.append(("all", "plus4"))
+        specs.append(("all", "wild"))
+    for card_type in SUPER_TYPES:
+        for _ in range(3):
+            specs.append(("super", card_type))
+    return tuple(Card(i, color, card_type) for i, (color, card_type) in enumerate(specs))
+
+CARDS = _build_card_table()
+
+def card_by_id(card_id):
+    return CARDS[card_id]
+DECK_CARDS = CARDS[:108]
+SUPER_CARDS = CARDS[108:]
+
+# Distinct card kinds in table order: 52 coloured cards (red, blue, yellow,
+# green x 13 types), plus4, wild, then the 4 super cards
+def _build_kinds():
+    kinds = []
+    kind_of_code = {}
+    for card in CARDS:
+        if card.code not in kind_of_code:
+            kind_of_code[card.code] = len(kinds)
+            kinds.append(card)
+    return tuple(kinds), kind_of_code
+
+KINDS, KIND_OF_CODE = _build_kinds()
+
+# Index of the table position for a (colour in play, top card type) pair
+def play_state(active_color, top_card):
+    return (active_color << TYPE_BITS) | top_card.type_id
+
+# Precomputed playability table: PLAYABLE[play_state(...)] is the set of
+# card codes that may be played, derived once from Card.is_playable
+def _build_playable_table():
+    kinds = {card.code: card for card in CARDS}
+    table = [frozenset()] * (max(COLOR_BITS.values()) << (TYPE_BITS + 1))
+    for active_color in COLOR_BITS.values():
+        for top in kinds.values():
+            table[play_state(active_color, top)] = frozenset(
+                code for code, card in kinds.items()
+                if card.is_playable(top, False, active_color))
+    return table
+
+PLAYABLE = _build_playable_table()
+
+# Every player's hand size, kept up to date by the hands themselves. A lazy
+# min-heap of (size, seat) entries answers "who has the fewest cards" (and
+# so "has anyone won") without scanning every hand; entries whose size no
+# longer matches are dropped when they reach the top.
+class HandSizes:
+    __slots__ = ("sizes", "heap")
+
+    def __init__(self, num_players):
+        self.sizes = [0] * num_players
+        self.heap = [(0, seat) for seat in range(num_players)]
+
+    def copy(self):
+        sizes = HandSizes.__new__(HandSizes)
+        sizes.sizes = self.sizes.copy()
+        sizes.heap = self.heap.copy()
+        return sizes
+
+    def update(self, seat, size):
+        self.sizes[seat] = size
+        heapq.heappush(self.heap, (size, seat))
+        if len(self.heap) > 4 * len(self.sizes) + 32:
+            self.rebuild()
+
+    # Drop stale entries; a sorted list is already a valid heap
+    def rebuild(self):
+        self.heap = sorted((size, seat) for seat, size in enumerate(self.sizes))
+
+    # Seat with the fewest cards (lowest seat on ties)
+    def fewest(self):
+        heap = self.heap
+        sizes = self.sizes
+        while heap[0][0] != sizes[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+# A player's hand. Behaves like a list of Cards but also keeps an index of
+# card code -> card ids and card id -> position, updated as cards come and
+# go, so legal moves can be listed without scanning the whole hand. Size
+# changes are reported to the game's HandSizes when the hand has a seat.
+class Hand(list):
+    __slots__ = ("by_code", "positions", "sizes", "seat")
+
+    def __init__(self, cards=(), sizes=None, seat=None):
+        super().__init__()
+        self.by_code = {}
+        self.positions = {}
+        self.sizes = sizes
+        self.seat = seat
+        self.extend(cards)
+
+    def index_card(self, card, position):
+        self.positions[card.id] = position
+        self.by_code.setdefault(card.code, set()).add(card.id)
+
+    def size_changed(self):
+        if self.sizes is not None:
+            self.sizes.update(self.seat, len(self))
+
+    def append(self, card):
+        self.index_card(card, len(self))
+        list.append(self, card)
+        self.size_changed()
+
+    def extend(self, cards):
+        for card in cards:
+            self.index_card(card, len(self))
+            list.append(self, card)
+        self.size_changed()
+
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        card = list.pop(self, index)
+        positions = self.positions
+        del positions[card.id]
+        for i in range(index, len(self)):  # Cards after the gap shift left
+            positions[self[i].id] = i
+        same_code = self.by_code[card.code]
+        same_code.discard(card.id)
+        if not same_code:
+            del self.by_code[card.code]
+        self.size_changed()
+        return card
+
+    def insert(self, index, card):
+        list.insert(self, index, card)
+        self.rebuild_index()
+        self.size_changed()
+
+    def remove(self, card):
+        self.pop(self.index(card))
+
+    def clear(self):
+        list.clear(self)
+        self.by_code.clear()
+        self.positions.clear()
+        self.size_changed()
+
+    # Copy for a cloned game, reporting sizes to that game's HandSizes
+    def copy(self, sizes=None):
+        hand = Hand.__new__(Hand)
+        list.extend(hand, self)
+        hand.by_code = {code: ids.copy() for code, ids in self.by_code.items()}
+        hand.positions = self.positions.copy()
+        hand.sizes = sizes
+        hand.seat = self.seat
+        return hand
+
+    def rebuild_index(self):
+        self.by_code.clear()
+        self.positions.clear()
+        for i, card in enumerate(self):
+            self.index_card(card, i)
+
+    # Sorted positions of the cards whose code is in playable_codes
+    def playable_indices(self, playable_codes):
+        by_code = self.by_code
+        positions = self.positions
+        if len(by_code) < len(playable_codes):
+            codes = [code for code in by_code if code in playable_codes]
+        else:
+            codes = [code for code in playable_codes if code in by_code]
+        indices = [positions[card_id] for code in codes for card_id in by_code[code]]
+        indices.sort()
+        return indices
+
+# The draw pile. The top of the pile is the end of `cards`, so drawing one
+# card or a batch is a pop/slice off the end. Cards put back at the bottom go
+# on the `under` stack (last one lowest) and become the pile once `cards`
+# runs out, so both ends are O(1).
+class DrawPile:
+    __slots__ = ("cards", "under")
+
+    def __init__(self, cards=None):
+        self.cards = cards if cards is not None else []
+        self.under = []
+
+    def __len__(self):
+        return len(self.cards) + len(self.under)
+
+    # Bottom to top
+    def __iter__(self):
+        yield from reversed(self.under)
+        yield from self.cards
+
+    def restock(self):
+        if not self.cards and self.under:
+            self.under.reverse()
+            self.cards, self.under = self.under, []
+
+    # Draw the top card
+    def pop(self):
+        if not self.cards:
+            self.restock()
+        return self.cards.pop()
+
+    # Draw up to n cards in one slice, top card first
+    def pop_many(self, n):
+        cards = self.cards
+        if len(cards) < n:
+            drawn = cards[::-1]
+            cards.clear()
+            self.restock()
+            return drawn + self.pop_many(n - len(drawn)) if self.cards else drawn
+        split = len(cards) - n
+        drawn = cards[split:]
+        del cards[split:]
+        drawn.reverse()
+        return drawn
+
+    # Put a card at the bottom of the pile
+    def appendleft(self, card):
+        self.under.append(card)
+
+    # Take over an already shuffled list as the whole pile (no copy)
+    def replace(self, cards):
+        self.cards = cards
+        self.under = []
+
+    def copy(self):
+        pile = DrawPile(self.cards.copy())
+        pile.under = self.under.copy()
+        return pile
+
+# Receives presentation side effects from the rules engine (sounds, images).
+# The engine never touches Qt itself; the GUI subscribes with add_observer.
+class UnoGameObserver:
+    # A player has emptied their hand
+    def on_winner(self, player_index):
+        pass
+
+    # A chosen colour should be shown on the discard pile
+    def on_color_displayed(self, color):
+        pass
+
+    # The events below report every state change, for UnoLog.GameRecorder
+
+    # A card left player_index's hand from position card_index
+    def on_card_played(self, player_index, card_index, card):
+        pass
+
+    # The player drew a card as their move
+    def on_card_drawn(self, player_index, card):
+        pass
+
+    # The player drew penalty cards (plus2/plus4)
+    def on_cards_drawn(self, player_index, cards):
+        pass
+
+    def on_super_card_drawn(self, player_index, card):
+        pass
+
+    # A wild colour was chosen
+    def on_color_chosen(self, color):
+        pass
+
+    # A super card's effect was set up; target is the skipped seat for
+    # chiefskip, otherwise None
+    def on_super_effect(self, card_type, player_index, target):
+        pass
+
+    # The discard pile was shuffled into the draw pile (cards, top last)
+    def on_deck_shuffled(self, cards):
+        pass
+
+    # The turn passed to player_index
+    def on_turn_ended(self, player_index):
+        pass
+
+# Turn and super-card state saved by UnoGame.snapshot, in order
+STATE_FIELDS = ("top_card", "previous_card", "active_color", "direction", "current_player",
+                "doublePlayed", "dpPlayer", "chiefPlayed", "playerToSkip", "canAllPlay",
+                "intplayer", "extplayer")
+_get_state = attrgetter(*STATE_FIELDS)
+
+class UnoGame:
+    # rng is any random.Random-like object; pass a seeded one to make the
+    # game reproducible. Every shuffle in the game goes through it.
+    def __init__(self, num_players, rng=None):
+        # Initialize variables for the game
+        self.rng = rng if rng is not None else random.Random()
+        self.deck = DrawPile()
+        self.super_deck = []
+        self.hand_sizes = HandSizes(num_players)
+        self.players = [Hand(sizes=self.hand_sizes, seat=i) for i in range(num_players)]
+        self.discard = []
+        self.top_card = None
+        self.active_color = None
+        self.direction = 1
+        self.current_player = 0
+        self.num_players = num_players
+        self.initialize_deck()
+        self.initialize_super_deck()
+        self.deal_cards()
+        self.initialize_top_card()
+        self.previous_card = self.top_card
+        self.observers = []
+
+        self.doublePlayed = False
+        self.dpPlayer = None
+        self.chiefPlayed = False
+        self.playerToSkip = None;
+        self.canAllPlay = False
+        self.intplayer = None
+        self.extplayer = None
+
+    # Compact immutable copy of the whole game: tuples of shared Card objects
+    # for the piles and hands, plus STATE_FIELDS. A snapshot can be restored
+    # any number of times.
+    def snapshot(self):
+        return (tuple(self.deck.cards), tuple(self.deck.under), tuple(self.super_deck),
+                tuple(map(tuple, self.players)), tuple(self.discard), _get_state(self))
+
+    def restore(self, snapshot):
+        deck, under, super_deck, hands, discard, state = snapshot
+        self.deck.replace(list(deck))
+        self.deck.under = list(under)
+        self.super_deck = list(super_deck)
+        for hand, cards in zip(self.players, hands):
+            list.clear(hand)
+            list.extend(hand, cards)
+            hand.rebuild_index()
+            hand.size_changed()
+        self.discard = list(discard)
+        for name, value in zip(STATE_FIELDS, state):
+            setattr(self, name, value)
+
+    # New game holding a snapshot's state, e.g. one sent to another process
+    @classmethod
+    def from_snapshot(cls, snapshot, rng=None):
+        game = cls.__new__(cls)
+        game.rng = rng if rng is not None else random.Random()
+        game.num_players = len(snapshot[3])
+        game.observers = []
+        game.deck = DrawPile()
+        game.hand_sizes = HandSizes(game.num_players)
+        game.players = [Hand(sizes=game.hand_sizes, seat=i) for i in range(game.num_players)]
+        game.restore(snapshot)
+        return game
+
+    # Independent copy for lookahead. Cards are shared flyweights, so only
+    # the containers are copied. The clone gets a copy of this game's RNG
+    # state unless rng is given, and no observers.
+    def clone(self, rng=None):
+        game = UnoGame.__new__(UnoGame)
+        game.__dict__.update(self.__dict__)
+        game.rng = rng if rng is not None else copy.copy(self.rng)
+        game.observers = []
+        game.deck = self.deck.copy()
+        game.super_deck = self.super_deck.copy()
+        game.discard = self.discard.copy()
+        game.hand_sizes = self.hand_sizes.copy()
+        game.players = [hand.copy(game.hand_sizes) for hand in self.players]
+        return game
+
+    # Subscribe to presentation events (see UnoGameObserver)
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    # Forward an event to every observer; free when nobody is listening
+    def notify(self, event, *args):
+        for observer in self.observers:
+            getattr(observer, event)(*args)
+
+    # Checks if any player has won (they have 0 cards in hand)
+    def check_winner(self):
+        fewest = self.hand_sizes.fewest()
+        if self.hand_sizes.sizes[fewest] == 0:
+            return fewest  # Player index who won
+        return -1  # No winner yet
+
+    # Create the normal deck
+    def initialize_deck(self):
+        cards = list(DECK_CARDS)
+        self.rng.shuffle(cards)
+        self.deck.replace(cards)
+
+    # Create the super deck
+    def initialize_super_deck(self):
+        self.super_deck.extend(SUPER_CARDS)  # 3 of each super card type
+        self.rng.shuffle(self.super_deck)
+
+    # Deal 7 cards to each player to start the game
+    def deal_cards(self):
+        for player in self.players:
+            player.extend(self.deck.pop_many(7))
+
+    # Start the discard pile with non-wild cards
+    def initialize_top_card(self):
+        while True:
+            if not self.deck:
+                self.replenish_deck()
+            card = self.deck.pop()
+            if card.type not in ["plus4", "wild"]:  # Avoid starting with a wild card
+                self.discard.append(card)
+                self.top_card = card
+                self.active_color = card.color_bit
+                break
+            else:
+                self.deck.appendleft(card)  # Put back the wild card at the bottom
+
+    # If the deck is empty, discard pile is reshuffled into the deck
+    def replenish_deck(self):
+        # Move all but the top card to the deck and shuffle
+        top = self.discard.pop()
+        cards = self.discard
+        self.discard = [top]
+        self.rng.shuffle(cards)
+        self.deck.replace(cards)  # The old discard list becomes the pile as-is
+        self.notify("on_deck_shuffled", cards)
+
+    # Checks if a card is playable
+    def can_player_play(self, player_index, card):
+        top_card = self.top_card
+        return card.is_playable(top_card, self.canAllPlay, self.active_color)
+
+    # Positions of the cards the player may play right now
+    def legal_moves(self, player_index):
+        hand = self.players[player_index]
+        if self.canAllPlay:
+            return list(range(len(hand)))
+        return hand.playable_indices(PLAYABLE[play_state(self.active_color, self.top_card)])
+
+    # Playing a card
+    def play_card(self, player_index, card_index):
+        player_hand = self.players[player_index]
+        selected_card = player_hand[card_index]
+
+        # Check if the card can be played
+        if (not selected_card.is_playable(self.top_card, self.canAllPlay, self.active_color)):
+            return False, "Invalid move. You can't play this card."
+
+        self.previous_card = self.top_card;
+        self.notify("on_card_played", player_index, card_index, selected_card)
+
+        # Conditions if a super card is played
+        if selected_card.color == "super":
+
+            # A super card keeps the colour already in play (self.active_color)
+
+            self.discard.append(selected_card)
+            self.top_card = selected_card
+            player_hand.pop(card_index)
+            if not player_hand:
+                self.notify("on_winner", player_index)
+            self.apply_super_card_effects(selected_card)  # Call a method for super card logic
+
+            #Super Card ExtPlayAll Effect
+            if self.extplayer != self.who_next_player() and self.extplayer != None:
+                self.canAllPlay = True
+
+            return True, "" # "Super card played!"
+
+        # Super card DoublePlay Effect
+        if(self.doublePlayed and self.dpPlayer == self.current_player):
+            self.back_a_player()
+            self.doublePlayed = False;
+
+        # Play the card
+        self.discard.append(selected_card)
+        self.top_card = selected_card
+        self.active_color = selected_card.color_bit  # "all" until a wild colour is chosen
+        player_hand.pop(card_index)
+        if not player_hand:
+            self.notify("on_winner", player_index)  # Cheer as soon as the last card leaves the hand
+
+        # Handle special card actions
+        if selected_card.type in ['wild', 'plus4']:
+            if selected_card.type == 'plus4':
+                self.apply_card_effects(selected_card)  # Ensure the effects are applied
+            return True, "Color selection needed."  # Signal that a special image is needed
+
+        # Apply any effects from the card
+        self.apply_card_effects(selected_card)
+
+        #Super Card Chief Skip Effect
+        if self.chiefPlayed == True and self.who_next_player() == self.playerToSkip:
+            self.next_player()
+            self.playerToSkip = None
+            self.chiefPlayed = False
+
+        #Super Card IntPlayAll Effect
+        if self.intplayer == self.who_next_player():
+            self.canAllPlay = True
+        if self.intplayer == self.current_player and self.canAllPlay == True:
+            self.canAllPlay = False
+            self.intplayer = None
+
+        #Super Card ExtPlayAll Effect
+        if self.extplayer == self.who_next_player():
+            self.canAllPlay = False
+            self.extplayer = None
+
+        return True, "" #"Card played successfully."
+
+    # Drawing cards
+    def draw_cards(self, player_index, number):
+        drawn = self.deck.pop_many(number)
+        if len(drawn) < number:
+            self.replenish_deck()
+            drawn += self.deck.pop_many(number - len(drawn))
+        self.players[player_index].extend(drawn)
+        self.notify("on_cards_drawn", player_index, drawn)
+
+    def draw_card(self, player_index):
+        if not self.deck:
+            self.replenish_deck()
+        if self.deck:
+            card = self.deck.pop()
+            self.players[player_index].append(card)
+            self.notify("on_card_drawn", player_index, card)
+
+            #Super Card Chief Skip Effect if Player Before Skipee Draws
+            if self.chiefPlayed == True and self.who_next_player() == self.playerToSkip:
+                self.next_player()
+                self.playerToSkip = None
+                self.chiefPlayed = False
+
+            return True, "" #"Card drawn."
+        else:
+            return False, "No cards to draw."
+
+    # Draw a super card into the player's hand
+    def draw_super_card(self, player_index):
+        if not self.super_deck:
+            return False, "No super cards left to draw."
+        card = self.super_deck.pop()
+        self.players[player_index].append(card)
+        self.notify("on_super_card_drawn", player_index, card)
+        return True, ""
+
+    # Headless turn for bots and simulations: apply one move for the current
+    # player, then pass the turn the same way UnoGameWindow does. A move is
+    # ("play", card_index, color), ("draw",) or ("super",); color is only
+    # used by wild/plus4. A failed play keeps the turn; a draw with nothing
+    # left to draw passes it so the game can still finish.
+    def take_turn(self, move):
+        player = self.current_player
+        if move[0] == "play":
+            success, message = self.play_card(player, move[1])
+            if not success:
+                return success, message
+            if message == "Color selection needed.":
+                self.choose_new_color(move[2])
+        elif move[0] == "super":
+            success, message = self.draw_super_card(player)
+            if not success:
+                return success, message
+        else:
+            success, message = self.draw_card(player)
+        self.end_turn()
+        return success, message
+
+    # Pass the turn once the current player's move is complete
+    def end_turn(self):
+        self.next_player()
+        self.notify("on_turn_ended", self.current_player)
+
+    # Moves to the next player based on the current direction
+    def next_player(self):
+        self.current_player = (self.current_player + self.direction) % self.num_players
+
+    # Stays with the same player based on the current direction (for double play super card)
+    def back_a_player(self):
+        self.current_player = (self.current_player - (self.direction)) % self.num_players
+
+    def on_color_selected(self, selected_color):
+        self.apply_card_effects(self.top_card, selected_color)
+
+    # Uno Action Card Effects
+    def apply_card_effects(self, card, selected_color=None):
+        if card.type == "skip":
+            self.next_player()
+        elif card.type == "reverse":
+            self.direction *= -1
+            if self.num_players == 2:
+                self.next_player()
+        elif card.type == "plus2":
+            self.draw_cards((self.current_player + self.direction) % self.num_players, 2)
+            self.next_player()
+        elif card.type == "plus4":
+            # The next player draws 4 cards and loses their turn
+            self.draw_cards((self.current_player + self.direction) % self.num_players, 4)
+            self.next_player()
+            return True, "Color selection needed."
+        elif card.type == "wild":
+            return True, "Color selection needed."  # Flag for UI to trigger color selection
+        if selected_color:
+                self.display_selected_color_image(selected_color)
+        return False, "No special effects."
+
+    # Super Card Effects
+    def apply_super_card_effects(self, card):
+        if card.type == "extplayall":
+            self.extplayer = self.current_player
+        elif card.type == "intplayall":
+            self.intplayer = self.current_player
+        elif card.type == "doubleplay":
+            self.doublePlayed = True;
+            self.dpPlayer = self.current_player
+        elif card.type == "chiefskip":
+            # Skip whoever holds the fewest cards
+            self.playerToSkip = self.hand_sizes.fewest()
+            self.chiefPlayed = True
+        self.notify("on_super_effect", card.type, self.current_player,
+                    self.playerToSkip if card.type == "chiefskip" else None)
+
+    def choose_new_color(self, new_color):
+        self.active_color = COLOR_BITS[new_color]  # The card itself is never recoloured
+        self.notify("on_color_chosen", new_color)
+
+    def select_color(self, color):
+        self.display_selected_color_image(color)
+
+    def display_selected_color_image(self, color):
+        self.notify("on_color_displayed", color)
+
+    # Returns the index of the next player
+    def who_next_player(self):
+        return (self.current_player + self.direction) % self.num_players
@@ -0,0 +1,204 @@
+# tests/test_equivalence.py
+# Safety net for the rules engine: the same moves through the table-driven
+# UnoGame and the frozen pre-table engine (reference_engine) must give the
+# same results and states; the vectorised BatchUnoGame must follow scalar
+# games move for move; logs must replay to the recorded states; and a
+# server's tables must survive a save and reload unchanged.
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+import UnoGame
+from UnoBots import BOTS, simple_policy
+from UnoLog import GameLogWriter, GameRecorder, read_games, replay
+from UnoGame import COLORS, KIND_OF_CODE, modifiers_pending
+from tests import reference_engine
+
+try:
+    import numpy as np
+    from UnoBatch import BatchUnoGame
+except ImportError:
+    np = None
+
+# A snapshot with card objects replaced by ids, comparable across engines
+def card_ids(snapshot):
+    def plain(value):
+        return value.id if isinstance(value, (UnoGame.Card, reference_engine.Card)) else value
+    deck, under, super_deck, hands, discard, state = snapshot
+    return ([plain(c) for c in deck], [plain(c) for c in under], [plain(c) for c in super_deck],
+            [[plain(c) for c in hand] for hand in hands], [plain(c) for c in discard],
+            [plain(value) for value in state])
+
+class ReferenceRulesTest(unittest.TestCase):
+    # Random moves, illegal ones included, so rejected plays are compared too
+    def test_same_moves_same_games(self):
+        for seed in range(300):
+            players = (2, 3, 4, 5, 7)[seed % 5]
+            game = UnoGame.UnoGame(players, rng=random.Random(seed))
+            reference = reference_engine.UnoGame(players, rng=random.Random(seed))
+            rng = random.Random(seed)
+            for turn in range(2000):
+                hand = game.players[game.current_player]
+                x = rng.random()
+                if x < 0.75 and hand:
+                    move = ("play", rng.randrange(len(hand)), rng.choice(COLORS[:4]))
+                elif x < 0.9:
+                    move = ("super",)
+                else:
+                    move = ("draw",)
+                result = game.take_turn(move)
+                self.assertEqual(result, reference.take_turn(move), (seed, turn, move))
+                self.assertEqual(card_ids(game.snapshot()), card_ids(reference.snapshot()),
+                                 (seed, turn))
+                self.assertEqual(game.pending, modifiers_pending(game), (seed, turn))
+                if game.check_winner() != -1:
+                    break
+
+# Deck order for both sides of the batch comparison: the scalar games sort a
+# reshuffled pile by card kind, and the batch (which keeps counts) needs no
+# order at all
+class SortedShuffle:
+    def shuffle(self, cards):
+        cards.sort(key=lambda card: KIND_OF_CODE[card.code])
+
+class NoShuffle:
+    def shuffle(self, cards):
+        pass
+
+@unittest.skipIf(np is None, "UnoBatch needs NumPy")
+class BatchTest(unittest.TestCase):
+    GAMES = 300
+
+    def load(self, batch, games):
+        for i, game in enumerate(games):
+            deck = [KIND_OF_CODE[card.code] for card in game.deck]
+            batch.deck[i, :] = 0
+            batch.deck[i, :len(deck)] = deck
+            batch.deck_len[i] = len(deck)
+            supers = [KIND_OF_CODE[card.code] for card in game.super_deck]
+            batch.super_deck[i, :len(supers)] = supers
+            batch.super_len[i] = len(supers)
+            batch.hands[i] = 0
+            for seat, hand in enumerate(game.players):
+                for card in hand:
+                    batch.hands[i, seat, KIND_OF_CODE[card.code]] += 1
+            batch.discard[i] = 0
+            for card in game.discard[:-1]:
+                batch.discard[i, KIND_OF_CODE[card.code]] += 1
+            batch.top[i] = KIND_OF_CODE[game.top_card.code]
+            batch.active[i] = game.active_color.bit_length() - 1
+
+    def assert_same(self, batch, i, game, turn):
+        def seat(value):
+            return -1 if value is None else value
+        fields = {
+            "current": (batch.current[i], game.current_player),
+            "direction": (batch.direction[i], game.direction),
+            "top": (batch.top[i], KIND_OF_CODE[game.top_card.code]),
+            "active": (1 << int(batch.active[i]), game.active_color),
+            "deck": (batch.deck_len[i], len(game.deck)),
+            "super deck": (batch.super_len[i], len(game.super_deck)),
+            "doubleplay": (batch.double_played[i], game.doublePlayed),
+            "chiefskip": (batch.chief_played[i], game.chiefPlayed),
+            "skipped": (batch.player_to_skip[i], seat(game.playerToSkip)),
+            "play all": (batch.can_all_play[i], game.canAllPlay),
+            "intplayall": (batch.int_player[i], seat(game.intplayer)),
+            "extplayall": (batch.ext_player[i], seat(game.extplayer)),
+        }
+        if game.doublePlayed:
+            fields["doubleplay seat"] = (batch.dp_player[i], game.dpPlayer)
+        for name, (batched, scalar) in fields.items():
+            self.assertEqual(batched, scalar, (turn, i, name))
+        for seat_index, hand in enumerate(game.players):
+            counts = np.zeros(batch.hands.shape[2], dtype=int)
+            for card in hand:
+                counts[KIND_OF_CODE[card.code]] += 1
+            self.assertTrue((counts == batch.hands[i, seat_index]).all(), (turn, i, seat_index))
+
+    def test_batch_follows_scalar_games(self):
+        games = [UnoGame.UnoGame(4, rng=random.Random(seed)) for seed in range(self.GAMES)]
+        batch = BatchUnoGame(self.GAMES, 4, seed=1)
+        self.load(batch, games)
+        for game in games:
+            game.rng = SortedShuffle()
+        batch.rng = NoShuffle()
+        done = [False] * self.GAMES
+        for turn in range(3000):
+            for i, game in enumerate(games):
+                if not done[i]:
+                    game.take_turn(simple_policy(game, game.current_player))
+            batch.step()
+            for i, game in enumerate(games):
+                if done[i]:
+                    continue
+                winner = game.check_winner()
+                if winner != -1:
+                    self.assertEqual(batch.winner[i], winner, (turn, i))
+                    done[i] = True
+                else:
+                    self.assert_same(batch, i, game, turn)
+            if all(done):
+                break
+        self.assertTrue(all(done))
+
+class LogReplayTest(unittest.TestCase):
+    def test_replay_rebuilds_every_turn(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.log")
+            finals = []
+            turns = []
+            with GameLogWriter(path) as writer:
+                for i in range(60):
+                    players = (2, 3, 4, 7, 10)[i % 5]
+                    game = UnoGame.UnoGame(players, rng=random.Random(i))
+                    rng = random.Random(i + 1000)
+                    bots = [BOTS["random"](rng) if seat % 2 else BOTS["simple"](rng)
+                            for seat in range(players)]
+                    GameRecorder(game, writer)
+                    snapshots = []
+                    for _ in range(3000):
+                        snapshots.append(game.snapshot())
+                        seat = game.current_player
+                        game.take_turn(bots[seat](game, seat))
+                        if game.check_winner() != -1:
+                            break
+                    finals.append(game.snapshot())
+                    turns.append(snapshots)
+            with open(path, "rb") as f:
+                games = list(read_games(f.read()))
+        self.assertEqual(len(games), len(finals))
+        for i, events in enumerate(games):
+            self.assertEqual(replay(events).snapshot(), finals[i], i)
+            for turn in random.Random(i).sample(range(len(turns[i])), min(5, len(turns[i]))):
+                self.assertEqual(replay(events, turn).snapshot(), turns[i][turn], (i, turn))
+
+class ServerSaveTest(unittest.TestCase):
+    # Tables part-way through their games, saved and loaded into a new server
+    def test_tables_round_trip(self):
+        from UnoServer import TableServer, run_load
+
+        async def round_trip(path):
+            server = TableServer()
+            port = await server.start("127.0.0.1", 0)
+            load = asyncio.create_task(run_load("127.0.0.1", port, 50, 4, 4, 1.0))
+            await asyncio.sleep(0.5)
+            server.save_tables(path)
+            saved = {name: (table.moves, table.game.snapshot()) for name, table in server.tables.items()}
+            copy = TableServer()
+            self.assertEqual(copy.load_tables(path), len(saved))
+            loaded = {name: (table.moves, table.game.snapshot()) for name, table in copy.tables.items()}
+            for table in list(copy.tables.values()):
+                copy.remove_table(table)
+            await load
+            await server.stop()
+            return saved, loaded
+
+        with tempfile.TemporaryDirectory() as directory:
+            saved, loaded = asyncio.run(round_trip(os.path.join(directory, "tables.save")))
+        self.assertTrue(saved)
+        self.assertEqual(loaded, saved)
+
+if __name__ == '__main__':
+    unittest.main()
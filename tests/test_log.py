@@ -0,0 +1,63 @@
+# tests/test_log.py
+# Game logs cut short must raise instead of yielding short records.
+import random
+import unittest
+
+from UnoBots import simple_policy
+from UnoGame import UnoGame
+from UnoLog import MAGIC, VERSION, START, SHUFFLE, PENALTY, GameRecorder, read_events
+
+# Keeps each record apart, so the test knows where records end
+class RecordList:
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(bytes(record))
+
+# The records of a short finished game that reshuffled the deck and dealt
+# a penalty, so every record kind with a variable length is present. Half
+# the moves are draws, or the deck would rarely run out.
+def recorded_game():
+    for seed in range(100):
+        rng = random.Random(seed)
+        writer = RecordList()
+        game = UnoGame(4, rng=random.Random(seed))
+        GameRecorder(game, writer)
+        while game.check_winner() == -1:
+            game.take_turn(("draw",) if rng.random() < 0.5 else simple_policy(game, game.current_player))
+        ops = {record[0] for record in writer.records}
+        if SHUFFLE in ops and PENALTY in ops and sum(map(len, writer.records)) < 4000:
+            return writer.records
+    raise AssertionError("no seed reshuffled and dealt a penalty")
+
+class TruncatedLogTest(unittest.TestCase):
+    def test_truncated_at_every_byte(self):
+        records = recorded_game()
+        header = MAGIC + bytes((VERSION,))
+        data = header + b"".join(records)
+        boundaries = {}  # size -> records wholly inside it
+        size = len(header)
+        for i, record in enumerate(records):
+            boundaries[size] = i
+            size += len(record)
+        boundaries[size] = len(records)
+
+        for size in range(len(header), len(data) + 1):
+            with self.subTest(size=size):
+                if size in boundaries:
+                    events = list(read_events(data[:size]))
+                    self.assertEqual(len(events), boundaries[size])
+                    if events:
+                        self.assertEqual(events[0][0], START)
+                else:
+                    with self.assertRaises(ValueError):
+                        list(read_events(data[:size]))
+
+    def test_short_header(self):
+        for size in range(len(MAGIC) + 1):
+            with self.assertRaises(ValueError):
+                list(read_events((MAGIC + bytes((VERSION,)))[:size]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_save.py
+# Save files: round trips, and truncated files failing loudly instead of
+# loading a damaged game.
+import os
+import random
+import tempfile
+import unittest
+
+from UnoBots import simple_policy
+from UnoGame import UnoGame
+from UnoSave import save_game, save_games, load_game, load_games
+
+# A game `turns` moves in (or over, if it ends first)
+def played_game(seed, players=4, turns=30):
+    game = UnoGame(players, rng=random.Random(seed))
+    for _ in range(turns):
+        if game.check_winner() != -1:
+            break
+        game.take_turn(simple_policy(game, game.current_player))
+    return game
+
+class SaveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "game.save")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for seed in range(20):
+            game = played_game(seed, players=2 + seed % 9)
+            save_game(self.path, game, turns=seed)
+            loaded, turns = load_game(self.path)
+            self.assertEqual(loaded.snapshot(), game.snapshot())
+            self.assertEqual(turns, seed)
+
+    def test_bulk_round_trip(self):
+        games = [(f"table-{i}", i, played_game(i)) for i in range(50)]
+        save_games(self.path, games)
+        loaded = list(load_games(self.path))
+        self.assertEqual([(name, turns) for name, turns, _ in loaded],
+                         [(name, turns) for name, turns, _ in games])
+        for (_, _, game), (_, _, copy) in zip(games, loaded):
+            self.assertEqual(copy.snapshot(), game.snapshot())
+
+    def test_truncated_at_every_byte(self):
+        save_game(self.path, played_game(1), turns=30)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for size in range(len(data)):
+            with open(self.path, "wb") as f:
+                f.write(data[:size])
+            with self.subTest(size=size), self.assertRaises(ValueError):
+                load_game(self.path)
+
+if __name__ == '__main__':
+    unittest.main()